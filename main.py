@@ -1,9 +1,10 @@
 """AI 期貨交易系統 - 主程式"""
 import asyncio
 import sys
+import time
 import argparse
 from pathlib import Path
-from datetime import datetime, time
+from datetime import datetime
 from typing import Dict
 import signal
 
@@ -557,6 +558,13 @@ class AITradingSystem:
             except asyncio.CancelledError:
                 pass
         
+        # 寫入尚未落地的訂單/部位/策略異動（單一失敗不中斷其餘寫入與關閉流程）
+        for mgr in (self.order_mgr, self.position_mgr, self.strategy_mgr):
+            try:
+                mgr.flush()
+            except Exception as e:
+                self.logger.error(f"❌ 關閉前寫入 {type(mgr).__name__} 異動失敗，資料可能未落地: {e}")
+        
         # 登出
         self.shioaji.logout()
         
@@ -570,7 +578,7 @@ class AITradingSystem:
         check_interval = self.config.trading.check_interval
         
         # 模擬模式下，記錄上次價格更新時間
-        last_price_update = datetime.now()
+        last_price_update = time.monotonic()
         price_update_interval = 60  # 每 60 秒更新一次價格
         
         # 連線狀態追蹤
@@ -597,8 +605,8 @@ class AITradingSystem:
                 # 3. 模擬模式下（未登入），定時生成新價格數據
                 # 只要已登入 Shioaji，就使用真實 tick 數據
                 if self.shioaji.skip_login:
-                    now = datetime.now()
-                    if (now - last_price_update).seconds >= price_update_interval:
+                    now = time.monotonic()
+                    if now - last_price_update >= price_update_interval:
                         await self._simulate_price_updates()
                         last_price_update = now
                 
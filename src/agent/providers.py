@@ -301,6 +301,11 @@ class AnthropicProvider(BaseProvider):
             "temperature": kwargs.get("temperature", self.temperature),
             "system": system_message
         }
+        if system_message:
+            # 系統提示為固定前綴，標記為可快取（未達最小長度時 API 會直接忽略）
+            payload["system"] = [
+                {"type": "text", "text": system_message, "cache_control": {"type": "ephemeral"}}
+            ]
         
         try:
             async with httpx.AsyncClient(
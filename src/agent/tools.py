@@ -12,6 +12,15 @@ from src.risk.risk_manager import RiskManager
 from src.notify.telegram import clean_markdown_for_telegram
 
 
+class ToolResult(str):
+    """工具回傳訊息（一般字串），另帶 success 旗標供 Web API 判斷成功與否，不需掃描訊息文字"""
+    
+    def __new__(cls, message: str, success: bool = True):
+        obj = super().__new__(cls, message)
+        obj.success = success
+        return obj
+
+
 class TradingTools:
     """交易工具集 - 供 AI Agent 調用"""
     
@@ -219,7 +228,7 @@ K線週期: {strategy.params.get('timeframe', 'N/A')}
         
         return text
     
-    def enable_strategy(self, strategy_id: str) -> str:
+    def enable_strategy(self, strategy_id: str) -> ToolResult:
         """啟用策略 (含檢查舊策略部位)"""
         logger.info(f"Enable strategy called: {strategy_id}")
         
@@ -227,27 +236,27 @@ K線週期: {strategy.params.get('timeframe', 'N/A')}
         strategy = self.strategy_mgr.get_strategy(strategy_id)
         if not strategy:
             logger.error(f"Strategy not found: {strategy_id}")
-            return f"❌ 找不到策略: {strategy_id}"
+            return ToolResult(f"❌ 找不到策略: {strategy_id}", success=False)
         
         # 檢查策略是否已通過驗證
         if not strategy.verified:
             if strategy.verification_status == "failed":
-                return f"""❌ 無法啟用策略：驗證失敗
+                return ToolResult(f"""❌ 無法啟用策略：驗證失敗
 ────────────────
 ID: {strategy_id}
 名稱: {strategy.name}
 驗證狀態：失敗
 原因：{strategy.verification_error}
 
-請重新建立策略或修改策略描述"""
+請重新建立策略或修改策略描述""", success=False)
             else:
-                return f"""❌ 無法啟用策略：尚未通過驗證
+                return ToolResult(f"""❌ 無法啟用策略：尚未通過驗證
 ────────────────
 ID: {strategy_id}
 名稱: {strategy.name}
 驗證狀態：{strategy.verification_status}
 
-請稍後再試或重新建立策略"""
+請稍後再試或重新建立策略""", success=False)
         
         logger.info(f"Found strategy: {strategy.name}, current enabled: {strategy.enabled}")
         
@@ -284,7 +293,7 @@ ID: {strategy_id}
                 "current_price": position.current_price
             }
             
-            return f"""
+            return ToolResult(f"""
 ⚠️ *警告：舊策略仍有部位*
 ─────────────────
 策略: {old_strategy.id} ({old_strategy.name})
@@ -297,7 +306,7 @@ ID: {strategy_id}
 
 請輸入: `confirm enable {strategy_id}` 確認強制平倉舊策略並啟用
 輸入: `cancel` 取消
-"""
+""", success=False)
         
         # 舊策略無部位，直接停用
         disabled = []
@@ -329,15 +338,15 @@ ID: {strategy_id}
 ✅ 策略已啟動完成，無需其他操作！"""
             if disabled:
                 result += f"\n\n⚠️ 已自動停用以下舊版本：\n" + "\n".join(f"  - {d}" for d in disabled)
-            return result
-        return f"❌ 啟用失敗: {strategy_id}"
+            return ToolResult(result)
+        return ToolResult(f"❌ 啟用失敗: {strategy_id}", success=False)
     
-    def confirm_enable_with_close(self, strategy_id: str) -> str:
+    def confirm_enable_with_close(self, strategy_id: str) -> ToolResult:
         """確認啟用策略 (強制平倉舊策略部位)"""
         
         # 檢查是否有待確認的啟用請求
         if not self._pending_enable or self._pending_enable.get("strategy_id") != strategy_id:
-            return f"❌ 沒有待確認的啟用請求: {strategy_id}"
+            return ToolResult(f"❌ 沒有待確認的啟用請求: {strategy_id}", success=False)
         
         pending = self._pending_enable
         old_strategy_id = pending["old_strategy_id"]
@@ -462,7 +471,7 @@ ID: {strategy_id}
             
             close_status = "✅ 已強制平倉" if close_success else f"❌ 平倉失敗: {close_error}"
             
-            return f"""✅ *{strategy_id} 策略已啟動！*
+            return ToolResult(f"""✅ *{strategy_id} 策略已啟動！*
 ────────────────────
 📌 策略名稱：{strategy.name}
 📌 期貨代碼：{strategy.symbol}（{self.get_futures_name(strategy.symbol)}）
@@ -474,11 +483,11 @@ ID: {strategy_id}
 損益: {pending['pnl']:+,.0f}
 
 ────────────────────
-✅ 策略已啟動完成，無需其他操作！"""
+✅ 策略已啟動完成，無需其他操作！""")
         
-        return f"❌ 啟用失敗: {strategy_id}"
+        return ToolResult(f"❌ 啟用失敗: {strategy_id}", success=False)
     
-    def disable_strategy(self, strategy_id: str) -> str:
+    def disable_strategy(self, strategy_id: str) -> ToolResult:
         """停用策略 (含詢問機制)"""
         
         # 先檢查是否有部位
@@ -487,7 +496,7 @@ ID: {strategy_id}
         if not check["can_disable"] and check["has_positions"]:
             # 有部位，發送警告並詢問
             pos = check["position"]
-            return f"""
+            return ToolResult(f"""
 ⚠️ *警告：策略仍有部位*
 ─────────────────
 策略ID: {strategy_id}
@@ -500,16 +509,16 @@ ID: {strategy_id}
 
 輸入: `confirm disable {strategy_id}` 確認停用
 輸入: `cancel` 取消
-"""
+""", success=False)
         
         # 無部位，直接停用
         if check["can_disable"]:
             self.strategy_mgr.disable_strategy(strategy_id)
-            return f"✅ 策略已停用: {strategy_id}"
+            return ToolResult(f"✅ 策略已停用: {strategy_id}")
         
-        return f"❌ 停用失敗: {strategy_id}"
+        return ToolResult(f"❌ 停用失敗: {strategy_id}", success=False)
     
-    def confirm_disable_strategy(self, strategy_id: str) -> str:
+    def confirm_disable_strategy(self, strategy_id: str) -> ToolResult:
         """確認停用策略 (含強制平倉)"""
         
         # 取得部位
@@ -525,7 +534,7 @@ ID: {strategy_id}
         # 停用策略
         self.strategy_mgr.disable_strategy(strategy_id)
         
-        return f"✅ 策略已強制平倉並停用: {strategy_id}"
+        return ToolResult(f"✅ 策略已強制平倉並停用: {strategy_id}")
     
     def _generate_strategy_id(self, symbol: str) -> str:
         """自動生成策略 ID：symbol + 年份後2碼 + 4位數字"""
@@ -657,13 +666,13 @@ ID: {strategy_id}
 新版本訊號將記錄到 v{strategy.strategy_version}.json
 """
     
-    def delete_strategy_tool(self, strategy_id: str) -> str:
+    def delete_strategy_tool(self, strategy_id: str) -> ToolResult:
         """刪除策略"""
         
         # 檢查策略是否存在
         strategy = self.strategy_mgr.get_strategy(strategy_id)
         if not strategy:
-            return f"❌ 找不到策略: {strategy_id}"
+            return ToolResult(f"❌ 找不到策略: {strategy_id}", success=False)
         
         # 檢查是否有部位
         position = self.position_mgr.get_position(strategy_id)
@@ -676,20 +685,20 @@ ID: {strategy_id}
                 "direction": position.direction,
                 "entry_price": position.entry_price
             }
-            return f"⚠️ 策略仍有部位 {position.symbol} {position.quantity}口，若確定刪除將強制平倉。請輸入 `confirm delete {strategy_id}` 確認刪除，或輸入 `cancel` 取消。"
+            return ToolResult(f"⚠️ 策略仍有部位 {position.symbol} {position.quantity}口，若確定刪除將強制平倉。請輸入 `confirm delete {strategy_id}` 確認刪除，或輸入 `cancel` 取消。", success=False)
         
         # 無部位，直接刪除
         self.strategy_mgr.delete_strategy(strategy_id)
         
-        return f"✅ 策略已刪除: {strategy_id}"
+        return ToolResult(f"✅ 策略已刪除: {strategy_id}")
     
-    def confirm_delete_strategy(self, strategy_id: str) -> str:
+    def confirm_delete_strategy(self, strategy_id: str) -> ToolResult:
         """確認刪除策略（含強制平倉）- 方案B：無pending時直接查詢狀態"""
         
         # 如果有 pending，驗證 strategy_id 匹配
         if self._pending_delete:
             if self._pending_delete.get("strategy_id") != strategy_id:
-                return "❌ 刪除衝突，請先完成當前待處理的刪除操作"
+                return ToolResult("❌ 刪除衝突，請先完成當前待處理的刪除操作", success=False)
             
             # 從 pending 取得部位資訊
             position_info = self._pending_delete
@@ -703,13 +712,13 @@ ID: {strategy_id}
             # 沒有 pending，直接查詢策略狀態（方案B）
             strategy = self.strategy_mgr.get_strategy(strategy_id)
             if not strategy:
-                return f"❌ 找不到策略: {strategy_id}"
+                return ToolResult(f"❌ 找不到策略: {strategy_id}", success=False)
             
             position = self.position_mgr.get_position(strategy_id)
             if not position or position.quantity == 0:
                 # 無部位，直接刪除
                 self.strategy_mgr.delete_strategy(strategy_id)
-                return f"✅ 策略已刪除: {strategy_id}"
+                return ToolResult(f"✅ 策略已刪除: {strategy_id}")
             
             symbol = position.symbol
             quantity = position.quantity
@@ -721,12 +730,12 @@ ID: {strategy_id}
             self.notifier.send_message(result)
         except Exception as e:
             logger.error(f"強制平倉失敗: {e}")
-            return f"❌ 強制平倉失敗: {str(e)}"
+            return ToolResult(f"❌ 強制平倉失敗: {str(e)}", success=False)
         
         # 刪除策略
         self.strategy_mgr.delete_strategy(strategy_id)
         
-        return f"✅ 策略已強制平倉並刪除: {strategy_id}"
+        return ToolResult(f"✅ 策略已強制平倉並刪除: {strategy_id}")
     
     def create_strategy_by_goal(self, goal: str, symbol: Optional[str] = None) -> str:
         """根據用戶目標建立策略（自動推斷參數）
@@ -1004,15 +1013,43 @@ K線週期: {params['timeframe']}
     
     def confirm_create_strategy(self, confirmed: bool) -> str:
         """確認或取消建立策略"""
+        return self.confirm_create_strategy_detail(confirmed)["result_text"]
+    
+    @staticmethod
+    def _confirm_result(result_text: str, created: bool = False, strategy_id: str = None,
+                        name: str = None, stage1: tuple = (False, None),
+                        stage2: tuple = (False, None)) -> dict:
+        return {
+            "created": created,
+            "strategy_id": strategy_id,
+            "name": name,
+            "stage1": {"passed": stage1[0], "error": stage1[1]},
+            "stage2": {"passed": stage2[0], "error": stage2[1]},
+            "result_text": result_text,
+        }
+    
+    def confirm_create_strategy_detail(self, confirmed: bool) -> dict:
+        """確認或取消建立策略（結構化結果，供 Web API 使用）
+        
+        Returns:
+            dict: {
+                "created": bool,
+                "strategy_id": str or None,
+                "name": str or None,
+                "stage1": {"passed": bool, "error": str or None},
+                "stage2": {"passed": bool, "error": str or None},
+                "result_text": str  # 與 confirm_create_strategy 回傳的訊息相同
+            }
+        """
         logger.info(f"confirm_create_strategy: confirmed={confirmed}, pending={self._pending_strategy is not None}, awaiting={self._awaiting_confirm}")
         
         if not self._pending_strategy:
             self._clear_pending()
-            return "❌ 沒有待確認的策略，請先說「幫我建立策略」"
+            return self._confirm_result("❌ 沒有待確認的策略，請先說「幫我建立策略」")
         
         if not confirmed:
             self._clear_pending()
-            return "❌ 已取消建立策略"
+            return self._confirm_result("❌ 已取消建立策略")
         
         # 確保處於確認狀態
         self._awaiting_confirm = True
@@ -1071,7 +1108,7 @@ K線週期: {params['timeframe']}
                 'stage1_log_file': stage1_log_file
             }
             
-            return f"""❌ 驗證失敗
+            result_text = f"""❌ 驗證失敗
 {'='*30}
 原因：{error_msg}
 
@@ -1079,6 +1116,18 @@ K線週期: {params['timeframe']}
 請重新設計策略，例如：
 • 「幫我設計一個更簡單的 TMF 策略」
 • 「幫我設計一個 RSI 策略」"""
+            
+            # 未標示階段的錯誤（如程式碼生成失敗）視為 Stage 1 失敗
+            stage = verify_result.get("stage") or 1
+            stage_error = error_msg
+            prefix = f"Stage {stage} 失敗:"
+            if stage_error.startswith(prefix):
+                stage_error = stage_error[len(prefix):].strip()
+            if stage == 2:
+                stages = {"stage1": (True, None), "stage2": (False, stage_error)}
+            else:
+                stages = {"stage1": (False, stage_error), "stage2": (False, None)}
+            return self._confirm_result(result_text, name=params["name"], **stages)
         
         self.strategy_mgr.store.save_strategy(strategy.to_dict())
         
@@ -1129,7 +1178,10 @@ K線週期: {params['timeframe']}
 請說「啟用 {strategy_id}」開始交易"""
         
         self._clear_pending()
-        return result
+        return self._confirm_result(
+            result, created=True, strategy_id=strategy_id, name=params["name"],
+            stage1=(True, None), stage2=(True, None)
+        )
     
     def _clear_pending(self) -> None:
         """清除待確認的策略狀態"""
@@ -1424,7 +1476,10 @@ K線週期: {data['timeframe']}
                 strategy.set_verification_failed(error)
                 logger.warning(f"Strategy {strategy.id} verification failed: {error}")
                 _notify_progress(f"⚠️ 驗證失敗 ({attempts}/3)：{error}")
-                return {"passed": False, "error": error, "stage1_log_file": stage1_log_file}
+                return {
+                    "passed": False, "error": error,
+                    "stage": verify_result.get("stage"), "stage1_log_file": stage1_log_file
+                }
                 
         except Exception as e:
             error_msg = f"驗證過程發生錯誤: {str(e)}"
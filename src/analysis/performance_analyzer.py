@@ -9,6 +9,9 @@ class PerformanceAnalyzer:
     
     def __init__(self, signal_recorder: SignalRecorder):
         self.recorder = signal_recorder
+        # analyze 結果快取：(strategy_id, period, version, 今日) -> 結果；訊號資料版本變動時整批清除
+        self._cache: Dict[Tuple, Dict[str, Any]] = {}
+        self._cache_version: Optional[int] = None
     
     def analyze(
         self, 
@@ -24,8 +27,17 @@ class PerformanceAnalyzer:
             version: 版本號 (None 表示最新版本)
             
         Returns:
-            dict: 績效分析結果
+            dict: 績效分析結果（快取共用物件，呼叫端請勿修改）
         """
+        data_version = self.recorder.data_version()
+        if data_version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = data_version
+        cache_key = (strategy_id, period, version, date.today())
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         if version is None:
             version = self.recorder.get_latest_version(strategy_id)
         
@@ -39,7 +51,7 @@ class PerformanceAnalyzer:
         
         signal_stats = self._analyze_signals(signals)
         
-        return {
+        result = {
             "strategy_id": strategy_id,
             "version": version,
             "period": period,
@@ -47,6 +59,8 @@ class PerformanceAnalyzer:
             "end_date": end_date,
             "signal_stats": signal_stats,
         }
+        self._cache[cache_key] = result
+        return result
     
     def _calculate_date_range(self, period: str) -> Tuple[Optional[str], Optional[str]]:
         """計算日期範圍
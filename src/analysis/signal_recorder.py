@@ -23,6 +23,11 @@ class SignalRecorder:
         self.workspace_dir = Path(workspace_dir)
         self.signals_dir = self.workspace_dir / "signals"
         self.signals_dir.mkdir(exist_ok=True)
+        self._version = 0  # 訊號檔寫入次數，供績效分析快取判斷是否過期
+    
+    def data_version(self) -> int:
+        """訊號資料版本（每次寫入訊號檔遞增）"""
+        return self._version
     
     def _get_version_file(self, strategy_id: str, version: int) -> Path:
         """取得版本檔案路徑"""
@@ -46,6 +51,7 @@ class SignalRecorder:
             json.dumps(signals, indent=2, ensure_ascii=False),
             encoding="utf-8"
         )
+        self._version += 1
     
     def _get_latest_version(self, strategy_id: str) -> int:
         """取得策略的最新版本號"""
@@ -247,6 +253,7 @@ class SignalRecorder:
         new_file = self._get_version_file(strategy_id, new_version)
         if not new_file.exists():
             new_file.write_text("[]", encoding="utf-8")
+            self._version += 1
         
         logger.info(f"策略 {strategy_id} 版本 {old_version} → {new_version}，歸檔 {count} 筆訊號")
         return count
@@ -795,6 +795,7 @@ class LLMGenerator:
             return {
                 "passed": False,
                 "error": f"Stage 1 失敗: {review_result['reason']}",
+                "stage": 1,
                 "attempts": attempt,
                 "stage1_log_file": str(log_file_path) if log_file_path else None
             }
@@ -809,6 +810,7 @@ class LLMGenerator:
             return {
                 "passed": False,
                 "error": f"Stage 2 失敗: {backtest_result['reason']}",
+                "stage": 2,
                 "attempts": attempt
             }
         
@@ -15,6 +15,7 @@ from src.storage.models import (
     OrderStatus,
     PositionDirection,
 )
+from src.storage.write_buffer import WriteBehindBuffer, BatchWriteError
 from src.storage.trade_log_store import TradeLogStore
 from src.storage.kbar_store import KBarStore
 from src.storage.kbar_manager import KBarManager
@@ -25,6 +26,8 @@ __all__ = [
     "PositionStore",
     "OrderStore",
     "PerformanceStore",
+    "WriteBehindBuffer",
+    "BatchWriteError",
     "TradeLogStore",
     "KBarStore",
     "KBarManager",
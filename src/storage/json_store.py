@@ -1,9 +1,20 @@
 """JSON 檔案儲存"""
+import heapq
 import json
+import os
+import tempfile
 from pathlib import Path
-from typing import Any, Optional, List
+from typing import Any, Iterator, Optional, List, Dict, Tuple
 from datetime import datetime
 from src.logger import logger
+from src.storage.write_buffer import BatchWriteError
+
+# orjson 為 C 擴充，序列化/解析速度遠快於標準 json；未安裝時退回標準 json
+try:
+    import orjson
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    orjson = None
 
 
 class JSONStore:
@@ -23,23 +34,56 @@ class JSONStore:
             return default if default is not None else {}
         
         try:
+            if orjson is not None:
+                with open(path, "rb") as f:
+                    return orjson.loads(f.read())
             with open(path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except json.JSONDecodeError:
             return default if default is not None else {}
     
     def save(self, filename: str, data: Any) -> None:
-        """儲存 JSON 檔案"""
+        """儲存 JSON 檔案
+        
+        先在記憶體序列化，一次寫入暫存檔後以 os.replace 原子替換，
+        程序在寫入途中中斷也不會留下半份 JSON。
+        """
         try:
             path = self._get_file_path(filename)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+            if orjson is not None:
+                raw = orjson.dumps(data, default=str, option=_ORJSON_OPTIONS)
+            else:
+                raw = json.dumps(data, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+            # 每次寫入使用唯一的暫存檔，多個執行緒同時儲存同一檔案時不會互相截斷暫存檔
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(raw)
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
             logger.info(f"✅ 檔案儲存成功: {filename}")
         except Exception as e:
             logger.error(f"❌ 檔案儲存失敗: {filename}, error: {e}")
             raise  # 重新拋出例外，讓上層知道儲存失敗
     
+    def _save_batch(self, files: Dict[str, Any], file_ops: Dict[str, list]) -> None:
+        """逐檔寫入批次結果；任一檔失敗時以 BatchWriteError 回報該檔尚未落地的異動"""
+        unsaved: list = []
+        errors: List[str] = []
+        for filename, data in files.items():
+            try:
+                self.save(filename, data)
+            except Exception as e:
+                unsaved.extend(file_ops.get(filename, []))
+                errors.append(f"{filename}: {e}")
+        if errors:
+            raise BatchWriteError(unsaved, errors)
+    
     def append(self, filename: str, item: dict) -> None:
         """追加資料到 JSON 陣列"""
         data = self.load(filename, [])
@@ -342,6 +386,46 @@ class PositionStore(JSONStore):
                 self.save(f"positions/{strategy_id}_positions.json", positions)
                 return True
         return False
+    
+    def apply_batch(self, ops: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """批次套用部位異動，每個策略檔案只讀寫一次
+        
+        Args:
+            ops: (操作, 資料) 列表，操作為 "add_position" 或 "update_position"
+        """
+        files: Dict[str, list] = {}
+        file_ops: Dict[str, list] = {}
+        
+        def positions_of(strategy_id: str) -> list:
+            filename = f"positions/{strategy_id}_positions.json"
+            if filename not in files:
+                positions = self.load(filename, [])
+                files[filename] = positions if isinstance(positions, list) else []
+            return files[filename]
+        
+        for op, payload in ops:
+            strategy_id = payload.get("strategy_id", "")
+            if not strategy_id:
+                logger.error(f"❌ 部位異動失敗: strategy_id 為空 ({op})")
+                continue
+            
+            file_ops.setdefault(f"positions/{strategy_id}_positions.json", []).append((op, payload))
+            if op == "add_position":
+                positions_of(strategy_id).append(payload)
+            elif op == "update_position":
+                for p in positions_of(strategy_id):
+                    if p.get("quantity", 0) > 0:
+                        p.update(payload["updates"])
+                        p["updated_at"] = datetime.now().isoformat()
+                        break
+            else:
+                logger.warning(f"未知的部位異動: {op}")
+        
+        self._save_batch(files, file_ops)
+
+
+def _order_timestamp(order: dict) -> str:
+    return order.get("timestamp", "")
 
 
 class OrderStore(JSONStore):
@@ -351,18 +435,48 @@ class OrderStore(JSONStore):
         super().__init__(workspace_dir)
         self.orders_dir = workspace_dir / "orders"
         self.orders_dir.mkdir(exist_ok=True)
+        self._version = 0  # 本程序內的寫入次數
     
     def _get_order_file(self, strategy_id: str) -> Path:
         return self.orders_dir / f"{strategy_id}_orders.json"
     
-    def get_all_orders(self) -> List[dict]:
-        """取得所有訂單"""
-        all_orders = []
+    def save(self, filename: str, data: Any) -> None:
+        super().save(filename, data)
+        self._version += 1
+    
+    def data_version(self) -> Tuple[int, int]:
+        """訂單資料版本，供查詢結果快取判斷是否過期
+        
+        寫入次數涵蓋本 store 的異動；orders 目錄 mtime 涵蓋其他程式碼新增/刪除檔案
+        （例如刪除策略時移除訂單檔）。
+        """
+        return self._version, os.stat(self.orders_dir).st_mtime_ns
+    
+    def iter_orders(self) -> Iterator[dict]:
+        """逐筆產生所有訂單（一次只載入一個策略的訂單檔）"""
+        for f in self.orders_dir.glob("*_orders.json"):
+            data = self.load(f"orders/{f.name}", [])
+            if data and isinstance(data, list):
+                yield from data
+    
+    def iter_orders_sorted_desc(self) -> Iterator[dict]:
+        """依時間由新到舊產生所有訂單
+        
+        各策略檔案分別排序後再以 heapq.merge 合併，不需對全部訂單重新排序。
+        訂單檔依下單順序追加，升冪排序在已排序資料上為線性時間，再反向走訪即為由新到舊；
+        排序的是 load() 剛讀出的私有串列，不影響其他呼叫端。生成器在第一次取值時才讀檔。
+        """
+        per_file = []
         for f in self.orders_dir.glob("*_orders.json"):
             data = self.load(f"orders/{f.name}", [])
             if data and isinstance(data, list):
-                all_orders.extend(data)
-        return all_orders
+                data.sort(key=_order_timestamp)
+                per_file.append(reversed(data))
+        yield from heapq.merge(*per_file, key=_order_timestamp, reverse=True)
+    
+    def get_all_orders(self) -> List[dict]:
+        """取得所有訂單"""
+        return list(self.iter_orders())
     
     def get_by_strategy(self, strategy_id: str) -> List[dict]:
         """取得特定策略的訂單"""
@@ -403,6 +517,39 @@ class OrderStore(JSONStore):
                          [x for x in self.get_by_strategy(strategy_id) if x.get("order_id") != order_id] + [o])
                 return True
         return False
+    
+    def apply_batch(self, ops: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """批次套用訂單異動，每個策略檔案只讀寫一次
+        
+        Args:
+            ops: (操作, 資料) 列表，操作為 "add_order" 或 "update_order_status"
+        """
+        files: Dict[str, list] = {}
+        file_ops: Dict[str, list] = {}
+        
+        def orders_of(strategy_id: str) -> list:
+            filename = f"orders/{strategy_id}_orders.json"
+            if filename not in files:
+                orders = self.load(filename, [])
+                files[filename] = orders if isinstance(orders, list) else []
+            return files[filename]
+        
+        for op, payload in ops:
+            file_ops.setdefault(f"orders/{payload.get('strategy_id', '')}_orders.json", []).append((op, payload))
+            if op == "add_order":
+                orders_of(payload.get("strategy_id", "")).append(payload)
+            elif op == "update_order_status":
+                for o in orders_of(payload.get("strategy_id", "")):
+                    if o.get("order_id") == payload["order_id"]:
+                        o["status"] = payload["status"]
+                        if payload.get("filled_price"):
+                            o["filled_price"] = payload["filled_price"]
+                            o["filled_time"] = payload.get("filled_time") or datetime.now().isoformat()
+                        break
+            else:
+                logger.warning(f"未知的訂單異動: {op}")
+        
+        self._save_batch(files, file_ops)
 
 
 class PerformanceStore(JSONStore):
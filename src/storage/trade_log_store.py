@@ -2,8 +2,9 @@
 import json
 import os
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from dataclasses import dataclass, asdict
 
 
@@ -18,6 +19,7 @@ class TradeLogEntry:
     symbol: str               # 期貨代碼
     message: str              # 詳細訊息
     details: Dict            # 額外資訊 (價格、數量、損益等)
+    formatted_time: str = ""  # 顯示用時間 (YYYY-MM-DD HH:MM:SS)，寫入時產生，讀取時不需再解析
     
     def to_dict(self) -> Dict:
         return asdict(self)
@@ -63,19 +65,21 @@ class TradeLogStore:
         Returns:
             log_id: 日誌條目ID
         """
+        now = datetime.now()
         entry = TradeLogEntry(
             id=self._generate_id(),
-            timestamp=datetime.now().isoformat(),
+            timestamp=now.isoformat(),
             event_type=event_type,
             strategy_id=strategy_id,
             strategy_name=strategy_name,
             symbol=symbol,
             message=message,
-            details=details or {}
+            details=details or {},
+            formatted_time=now.strftime('%Y-%m-%d %H:%M:%S')
         )
         
         # 寫入當日檔案
-        today_file = self._get_filename(datetime.now())
+        today_file = self._get_filename(now)
         logs = self._load_file(today_file)
         logs.append(entry.to_dict())
         
@@ -132,26 +136,30 @@ class TradeLogStore:
         Returns:
             日誌條目列表 (由新到舊排序)
         """
-        all_logs = []
+        if limit <= 0:
+            return []
+        return list(islice(self.iter_recent_logs(event_type, strategy_id), limit))
+    
+    def iter_recent_logs(self, event_type: Optional[str] = None,
+                         strategy_id: Optional[str] = None) -> Iterator[Dict]:
+        """由新到舊逐筆產生保留期間內的交易日誌
         
-        # 載入最近7天的所有檔案
+        檔案依日期切分：由今天往前逐日載入並過濾，呼叫端停止迭代後即不再讀取更舊的檔案。
+        """
+        now = datetime.now()
         for days_ago in range(self.retention_days):
-            date = datetime.now() - timedelta(days=days_ago)
-            filepath = self._get_filename(date)
-            logs = self._load_file(filepath)
-            all_logs.extend(logs)
-        
-        # 由新到舊排序
-        all_logs.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # 過濾
-        filtered = all_logs
-        if event_type:
-            filtered = [log for log in filtered if log['event_type'] == event_type]
-        if strategy_id:
-            filtered = [log for log in filtered if log['strategy_id'] == strategy_id]
-        
-        return filtered[:limit]
+            logs = self._load_file(self._get_filename(now - timedelta(days=days_ago)))
+            if not logs:
+                continue
+            
+            # 同一天內由新到舊
+            logs.sort(key=lambda x: x['timestamp'], reverse=True)
+            for log in logs:
+                if event_type and log['event_type'] != event_type:
+                    continue
+                if strategy_id and log['strategy_id'] != strategy_id:
+                    continue
+                yield log
     
     def get_event_types(self) -> List[str]:
         """取得所有可用的事件類型（用於過濾選項）"""
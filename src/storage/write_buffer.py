@@ -0,0 +1,88 @@
+"""寫入緩衝 - 將短時間內的多筆儲存異動合併為一次寫檔"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.logger import logger
+
+# 預設合併視窗（秒）
+DEFAULT_FLUSH_INTERVAL = 0.02
+# 計時器寫入失敗時的自動重試次數上限（超過後保留在佇列，待下次 queue()/flush() 再寫）
+MAX_RETRIES = 5
+
+
+class BatchWriteError(Exception):
+    """apply_batch() 部分檔案寫入失敗；ops 為尚未落地、需要重試的異動"""
+
+    def __init__(self, ops: List[Tuple[str, Dict[str, Any]]], errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.ops = ops
+
+
+class WriteBehindBuffer:
+    """延遲寫入緩衝
+
+    異動先排入佇列，在 flush_interval 後由計時器一次交給 store.apply_batch()，
+    讓連續的下單/成交/平倉只產生一次檔案讀寫。需要立即落地時可直接呼叫 flush()。
+    寫入失敗的異動會放回佇列前端重試，不會遺失；直接呼叫 flush() 時失敗會重新拋出例外。
+    """
+
+    def __init__(self, store: Any, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._pending_writes: List[Tuple[str, Dict[str, Any]]] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._failures = 0
+
+    def queue(self, op: str, payload: Dict[str, Any]) -> None:
+        """排入一筆異動"""
+        with self._lock:
+            self._pending_writes.append((op, payload))
+            if self._timer is None:
+                self._arm(self.flush_interval)
+
+    def _arm(self, delay: float) -> None:
+        """啟動延遲寫入計時器（呼叫端需持有 _lock）"""
+        self._timer = threading.Timer(delay, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self) -> None:
+        """計時器觸發的寫入：失敗時在重試上限內以遞增間隔重新排程"""
+        with self._lock:
+            try:
+                self.flush()
+            except Exception:
+                if self._failures <= MAX_RETRIES:
+                    self._arm(self.flush_interval * (2 ** self._failures))
+                else:
+                    logger.error(
+                        f"❌ 批次寫入已重試 {MAX_RETRIES} 次仍失敗，"
+                        f"{len(self._pending_writes)} 筆異動保留待下次寫入"
+                    )
+
+    def flush(self) -> None:
+        """立即寫入所有待處理異動
+
+        寫入失敗時異動會放回佇列前端並重新拋出例外，讓呼叫端（如關閉流程）知道儲存失敗。
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            ops, self._pending_writes = self._pending_writes, []
+            if not ops:
+                return
+            try:
+                self.store.apply_batch(ops)
+            except Exception as e:
+                # 已寫入的檔案不重放（避免重複新增），其餘放回佇列前端，維持與之後排入異動的先後順序
+                unsaved = e.ops if isinstance(e, BatchWriteError) else ops
+                self._pending_writes[:0] = unsaved
+                self._failures += 1
+                logger.error(f"❌ 批次寫入失敗 ({len(unsaved)}/{len(ops)} 筆)，已保留待重試: {e}")
+                raise
+            self._failures = 0
+
+    def __len__(self) -> int:
+        return len(self._pending_writes)
@@ -0,0 +1,30 @@
+"""時間字串快取 - 同一秒內重複使用已格式化的日期/時間字串"""
+import time
+from datetime import datetime
+from typing import Tuple
+
+# (epoch 秒, "YYYY-MM-DD", ISO 時間字串)
+_NOW_CACHE: Tuple[int, str, str] = (0, "", "")
+
+
+def now_strings() -> Tuple[str, str]:
+    """取得 (今日日期, ISO 時間) 字串，精度為秒
+
+    下單/部位變動常在同一秒內連續發生，快取可避免每次都建立 datetime 並格式化。
+    """
+    global _NOW_CACHE
+    sec = int(time.time())
+    if sec != _NOW_CACHE[0]:
+        now = datetime.fromtimestamp(sec)
+        _NOW_CACHE = (sec, now.strftime("%Y-%m-%d"), now.isoformat())
+    return _NOW_CACHE[1], _NOW_CACHE[2]
+
+
+def now_iso() -> str:
+    """取得目前 ISO 時間字串（秒精度）"""
+    return now_strings()[1]
+
+
+def today_str() -> str:
+    """取得今日日期字串 YYYY-MM-DD"""
+    return now_strings()[0]
@@ -1,12 +1,19 @@
 """訂單類別"""
-from datetime import datetime
 from typing import Optional
 import uuid
 
+from src.trading.clock import now_iso
+
 
 class Order:
     """訂單類別"""
     
+    __slots__ = (
+        "order_id", "strategy_id", "strategy_name", "symbol", "action", "quantity",
+        "price", "price_type", "order_type", "reason", "is_close_order", "status",
+        "filled_price", "filled_time", "timestamp", "shioaji_trade", "seqno",
+    )
+    
     def __init__(
         self,
         strategy_id: str,
@@ -35,7 +42,7 @@ class Order:
         self.status = "Pending"  # Pending, Submitted, Filled, Cancelled, Rejected
         self.filled_price: Optional[float] = None
         self.filled_time: Optional[str] = None
-        self.timestamp = datetime.now().isoformat()
+        self.timestamp = now_iso()
         
         # Shioaji 相關
         self.shioaji_trade = None
@@ -95,7 +102,7 @@ class Order:
         """標記為已成交"""
         self.status = "Filled"
         self.filled_price = filled_price
-        self.filled_time = datetime.now().isoformat()
+        self.filled_time = now_iso()
     
     def mark_cancelled(self) -> None:
         """標記為已取消"""
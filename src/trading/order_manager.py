@@ -1,11 +1,20 @@
 """下單管理器"""
-from typing import List, Optional, Dict, Any, Callable
+import bisect
+import time
+from typing import List, Optional, Dict, Any, Callable, ValuesView
 from pathlib import Path
 from datetime import datetime, timedelta
 
 from src.logger import logger
 from src.trading.order import Order
+from src.trading.clock import today_str
 from src.storage.json_store import OrderStore
+from src.storage.write_buffer import WriteBehindBuffer
+
+# 終態訂單：轉換後即移出待處理
+_TERMINAL_STATUSES = frozenset({"Filled", "Cancelled", "Rejected"})
+# 計入今日統計的終態
+_STAT_KEYS = {"Filled": "filled", "Cancelled": "cancelled"}
 
 
 class OrderManager:
@@ -13,15 +22,23 @@ class OrderManager:
     
     def __init__(self, workspace_dir: Path):
         self.store = OrderStore(workspace_dir)
+        self._writes = WriteBehindBuffer(self.store)  # 合併短時間內的訂單寫入
         self.pending_orders: Dict[str, Order] = {}  # order_id -> Order
         self.seqno_mapping: Dict[str, str] = {}  # seqno -> order_id
-        self.order_timestamps: List[datetime] = []  # 用於頻率限制
+        self.order_timestamps: List[float] = []  # time.monotonic()，用於頻率限制
         
         # 回調
         self.on_order_submitted: Optional[Callable] = None
         self.on_order_filled: Optional[Callable] = None
         self.on_order_cancelled: Optional[Callable] = None
         self.on_order_rejected: Optional[Callable] = None
+        
+        # 今日訂單快取與統計（隨異動維護，換日時從儲存重建）
+        self._today = ""
+        self._today_orders: List[dict] = []
+        self._today_index: Dict[str, dict] = {}  # order_id -> 今日訂單 dict
+        self._stats: Dict[str, int] = {}
+        self._roll_today()
     
     def create_order(
         self,
@@ -50,40 +67,85 @@ class OrderManager:
             is_close_order=is_close_order
         )
         
+        self._ensure_today()
+        
         # 儲存到待處理
         self.pending_orders[order.order_id] = order
         
         # 記錄時間戳
-        self.order_timestamps.append(datetime.now())
+        self.order_timestamps.append(time.monotonic())
         
         # 寫入儲存
-        self.store.add_order(order.to_dict())
+        self._writes.queue("add_order", order.to_dict())
+        self._track_new_order(order)
         
-        logger.info(f"建立訂單: {order}")
+        logger.info("建立訂單: {}", order)
         return order
     
     def submit_order(self, order_id: str, seqno: str = None) -> bool:
         """提交訂單"""
-        order = self.pending_orders.get(order_id)
-        if not order:
+        order = self._transition(order_id, Order.mark_submitted, seqno)
+        if order is None:
             return False
         
-        order.mark_submitted(seqno)
-        
         # 註冊 seqno 映射
         if seqno:
             self.seqno_mapping[seqno] = order_id
-            logger.debug(f"註冊映射：seqno={seqno} → order_id={order_id}")
-        
-        # 更新儲存
-        self.store.update_order_status(order_id, "Submitted")
+            logger.debug("註冊映射：seqno={} → order_id={}", seqno, order_id)
         
         if self.on_order_submitted:
             self.on_order_submitted(order)
         
-        logger.info(f"訂單已提交：{order_id}, seqno: {seqno}")
+        logger.info("訂單已提交：{}, seqno: {}", order_id, seqno)
         return True
     
+    def _transition(self, order_id: str, mark: Callable, *args) -> Optional[Order]:
+        """訂單狀態轉換：查找 → 標記 → 排入寫入 → 終態時累計統計並移出待處理
+        
+        Args:
+            mark: Order 的狀態標記方法（如 Order.mark_filled）
+            args: 傳給標記方法的參數
+        
+        Returns:
+            轉換後的訂單，找不到時為 None
+        """
+        order = self.pending_orders.get(order_id)
+        if order is None:
+            return None
+        
+        mark(order, *args)
+        self._queue_status(order)
+        
+        if order.status in _TERMINAL_STATUSES:
+            stat_key = _STAT_KEYS.get(order.status)
+            if stat_key:
+                self._count_order(order, stat_key)
+            # 從待處理移除（歷史紀錄以儲存為準）
+            self._evict(order)
+        
+        return order
+    
+    def _queue_status(self, order: Order) -> None:
+        """排入訂單狀態更新，並同步今日訂單快取"""
+        self._writes.queue("update_order_status", {
+            "order_id": order.order_id,
+            "strategy_id": order.strategy_id,
+            "status": order.status,
+            "filled_price": order.filled_price,
+            "filled_time": order.filled_time
+        })
+        
+        cached = self._today_index.get(order.order_id)
+        if cached is not None:
+            cached["status"] = order.status
+            if order.filled_price:
+                cached["filled_price"] = order.filled_price
+                cached["filled_time"] = order.filled_time
+    
+    def flush(self) -> None:
+        """立即寫入所有待處理的訂單異動"""
+        self._writes.flush()
+    
     def get_order_by_seqno(self, seqno: str) -> Optional[Order]:
         """通過 seqno 查找訂單"""
         order_id = self.seqno_mapping.get(seqno)
@@ -95,68 +157,53 @@ class OrderManager:
         """清理映射（成交/取消後調用）"""
         if seqno in self.seqno_mapping:
             deleted_id = self.seqno_mapping.pop(seqno)
-            logger.debug(f"清理映射：seqno={seqno} (order_id={deleted_id})")
+            logger.debug("清理映射：seqno={} (order_id={})", seqno, deleted_id)
     
     def fill_order(self, order_id: str, filled_price: float) -> Optional[Order]:
         """成交"""
-        order = self.pending_orders.get(order_id)
-        if not order:
+        order = self._transition(order_id, Order.mark_filled, filled_price)
+        if order is None:
             return None
         
-        order.mark_filled(filled_price)
-        
-        # 更新儲存
-        self.store.update_order_status(order_id, "Filled", filled_price)
-        
         if self.on_order_filled:
             self.on_order_filled(order)
         
-        logger.info(f"訂單成交: {order_id} @ {filled_price}")
+        logger.info("訂單成交: {} @ {}", order_id, filled_price)
         return order
     
     def cancel_order(self, order_id: str) -> bool:
         """取消訂單"""
-        order = self.pending_orders.get(order_id)
-        if not order:
+        order = self._transition(order_id, Order.mark_cancelled)
+        if order is None:
             return False
         
-        order.mark_cancelled()
-        
-        # 更新儲存
-        self.store.update_order_status(order_id, "Cancelled")
-        
-        # 從待處理移除
-        del self.pending_orders[order_id]
-        
         if self.on_order_cancelled:
             self.on_order_cancelled(order)
         
-        logger.info(f"訂單已取消: {order_id}")
+        logger.info("訂單已取消: {}", order_id)
         return True
     
     def reject_order(self, order_id: str, reason: str = "") -> bool:
         """拒絕訂單"""
-        order = self.pending_orders.get(order_id)
-        if not order:
+        order = self._transition(order_id, Order.mark_rejected, reason)
+        if order is None:
             return False
         
-        order.mark_rejected(reason)
-        
-        # 更新儲存
-        self.store.update_order_status(order_id, "Rejected")
-        
-        # 從待處理移除
-        del self.pending_orders[order_id]
-        
         if self.on_order_rejected:
             self.on_order_rejected(order, reason)
         
-        logger.warning(f"訂單被拒絕: {order_id}, 原因: {reason}")
+        logger.warning("訂單被拒絕: {}, 原因: {}", order_id, reason)
         return True
     
-    def get_pending_orders(self) -> List[Order]:
-        """取得待處理訂單"""
-        return list(self.pending_orders.values())
+    def _evict(self, order: Order) -> None:
+        """終態訂單移出待處理及 seqno 映射，避免長時間執行時無限累積"""
+        self.pending_orders.pop(order.order_id, None)
+        if order.seqno and self.seqno_mapping.get(order.seqno) == order.order_id:
+            del self.seqno_mapping[order.seqno]
+    
+    def get_pending_orders(self) -> ValuesView[Order]:
+        """取得待處理訂單（唯讀檢視，需索引時請自行 list()）"""
+        return self.pending_orders.values()
     
     def get_order(self, order_id: str) -> Optional[Order]:
         """取得訂單"""
@@ -164,22 +211,20 @@ class OrderManager:
     
     def get_orders_by_strategy(self, strategy_id: str) -> List[dict]:
         """取得策略的訂單"""
+        self.flush()
         return self.store.get_by_strategy(strategy_id)
     
     def get_today_orders(self) -> List[dict]:
-        """取得今日訂單"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        return self.store.get_by_date(today)
+        """取得今日訂單（由記憶體快取提供）"""
+        self._ensure_today()
+        return [o.copy() for o in self._today_orders]
     
     def check_rate_limit(self, max_orders_per_minute: int = 5) -> bool:
         """檢查下單頻率限制"""
-        now = datetime.now()
+        cutoff = time.monotonic() - 60
         
-        # 清除超過1分鐘的記錄
-        self.order_timestamps = [
-            t for t in self.order_timestamps 
-            if (now - t).seconds < 60
-        ]
+        # 清除超過1分鐘的記錄（時間戳依建立順序遞增，二分搜尋切點）
+        del self.order_timestamps[:bisect.bisect_right(self.order_timestamps, cutoff)]
         
         if len(self.order_timestamps) >= max_orders_per_minute:
             logger.warning(f"下單頻率過高: {len(self.order_timestamps)}/{max_orders_per_minute}")
@@ -192,19 +237,47 @@ class OrderManager:
         # 這裡可以實作清理邏輯
         pass
     
+    def _roll_today(self) -> None:
+        """從儲存重建今日訂單快取與統計"""
+        self.flush()
+        self._today = today_str()
+        self._today_orders = self.store.get_by_date(self._today)
+        self._today_index = {o.get("order_id"): o for o in self._today_orders}
+        self._stats = {
+            "total": len(self._today_orders),
+            "filled": sum(1 for o in self._today_orders if o.get("status") == "Filled"),
+            "cancelled": sum(1 for o in self._today_orders if o.get("status") == "Cancelled")
+        }
+    
+    def _ensure_today(self) -> None:
+        """換日時重建今日快取"""
+        if today_str() != self._today:
+            self._roll_today()
+    
+    def _track_new_order(self, order: Order) -> None:
+        """將新訂單加入今日快取（只計入快取日期當天建立的訂單）"""
+        if not order.timestamp.startswith(self._today):
+            return
+        data = order.to_dict()
+        self._today_orders.append(data)
+        self._today_index[order.order_id] = data
+        self._stats["total"] += 1
+    
+    def _count_order(self, order: Order, key: str) -> None:
+        """累加今日訂單統計"""
+        if order.order_id in self._today_index:
+            self._stats[key] += 1
+    
     def get_order_statistics(self) -> Dict[str, Any]:
         """取得訂單統計"""
-        today_orders = self.get_today_orders()
-        
-        filled = [o for o in today_orders if o.get("status") == "Filled"]
-        cancelled = [o for o in today_orders if o.get("status") == "Cancelled"]
+        self._ensure_today()
         
         return {
-            "total_orders": len(today_orders),
-            "filled": len(filled),
-            "cancelled": len(cancelled),
+            "total_orders": self._stats["total"],
+            "filled": self._stats["filled"],
+            "cancelled": self._stats["cancelled"],
             "pending": len(self.pending_orders),
-            "today": datetime.now().strftime("%Y-%m-%d")
+            "today": self._today
         }
     
     def get_stale_orders(self, timeout_seconds: int = 300) -> List[Order]:
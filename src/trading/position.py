@@ -1,12 +1,31 @@
 """部位類別"""
-from datetime import datetime
 from typing import Optional
 from src.storage.models import PositionDirection
+from src.trading.clock import now_iso
+
+# 每點價值（元/點），以合約代碼前三碼查詢
+_POINT_VALUES = {
+    "TXF": 200,  # 大台
+    "MXF": 50,   # 小台
+    "TMF": 10,   # 微台
+}
+
+
+def _point_value(symbol: str) -> int:
+    """取得合約每點價值，未知合約以小台計"""
+    return _POINT_VALUES.get(symbol[:3], 50)
 
 
 class Position:
     """部位類別"""
     
+    __slots__ = (
+        "strategy_id", "strategy_name", "symbol", "direction", "quantity",
+        "entry_price", "entry_time", "stop_loss", "take_profit", "signal_id",
+        "strategy_version", "current_price", "pnl", "point_value",
+        "_sign", "_entry", "_pnl_mult", "_sl", "_tp", "_dict_cache",
+    )
+    
     def __init__(
         self,
         strategy_id: str,
@@ -26,7 +45,7 @@ class Position:
         self.direction = direction
         self.quantity = quantity
         self.entry_price = entry_price
-        self.entry_time = datetime.now().isoformat()
+        self.entry_time = now_iso()
         
         self.stop_loss = stop_loss
         self.take_profit = take_profit
@@ -37,52 +56,45 @@ class Position:
         self.current_price = entry_price
         self.pnl = 0.0
         
-        # 點數價值 (大台200元/點, 小台50元/點)
-        self.point_value = 200 if "TXF" in symbol or "T" in symbol else 50
+        # 點數價值 (大台200元/點, 小台50元/點, 微台10元/點)
+        self.point_value = _point_value(symbol)
+        
+        # 預先計算 tick 路徑所需的數值（多=+1, 空=-1），避免每次比較方向字串
+        # 確保價格為 float 類型，避免 Decimal 與 float 運算錯誤
+        self._sign = 1 if direction == "Buy" else -1
+        self._entry = float(entry_price)
+        self._pnl_mult = self._sign * quantity * self.point_value
+        self._sl = float(stop_loss) if stop_loss else None
+        self._tp = float(take_profit) if take_profit else None
+        
+        # to_dict 的靜態欄位快照（current_price / pnl 每次即時帶入）
+        self._dict_cache: Optional[dict] = None
     
     def calculate_pnl(self, current_price: float) -> float:
         """計算未實現損益"""
-        # 確保價格為 float 類型，避免 Decimal 與 float 運算錯誤
         current_price = float(current_price)
-        entry_price = float(self.entry_price)
-        
         self.current_price = current_price
-        
-        if self.direction == "Buy":
-            self.pnl = (current_price - entry_price) * self.quantity * self.point_value
-        else:  # Sell
-            self.pnl = (entry_price - current_price) * self.quantity * self.point_value
-        
+        self.pnl = (current_price - self._entry) * self._pnl_mult
         return self.pnl
     
     def check_stop_loss(self, current_price: float) -> bool:
         """檢查是否觸發停損"""
-        if not self.stop_loss:
-            return False
-        
-        current_price = float(current_price)
-        stop_loss = float(self.stop_loss)
-        
-        if self.direction == "Buy":
-            return current_price <= stop_loss
-        else:
-            return current_price >= stop_loss
+        return self._sl is not None and (float(current_price) - self._sl) * self._sign <= 0
     
     def check_take_profit(self, current_price: float) -> bool:
         """檢查是否觸發止盈"""
-        if not self.take_profit:
-            return False
-        
-        current_price = float(current_price)
-        take_profit = float(self.take_profit)
-        
-        if self.direction == "Buy":
-            return current_price >= take_profit
-        else:
-            return current_price <= take_profit
+        return self._tp is not None and (float(current_price) - self._tp) * self._sign >= 0
     
     def to_dict(self) -> dict:
         """轉換為字典"""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        data = self._dict_cache.copy()
+        data["current_price"] = self.current_price
+        data["pnl"] = self.pnl
+        return data
+    
+    def _build_dict(self) -> dict:
         return {
             "strategy_id": self.strategy_id,
             "strategy_name": self.strategy_name,
@@ -117,6 +129,7 @@ class Position:
         position.entry_time = data.get("entry_time", position.entry_time)
         position.current_price = data.get("current_price", position.entry_price)
         position.pnl = data.get("pnl", 0)
+        position._dict_cache = None
         return position
     
     def __repr__(self) -> str:
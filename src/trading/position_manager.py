@@ -1,11 +1,54 @@
 """部位管理器"""
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
+from collections import defaultdict
 from pathlib import Path
-from datetime import datetime
+import numpy as np
 
 from src.logger import logger
 from src.trading.position import Position
+from src.trading.clock import now_iso
 from src.storage.json_store import PositionStore
+from src.storage.write_buffer import WriteBehindBuffer
+
+
+# 部位數達此門檻才使用 NumPy 向量化更新價格
+VECTORIZE_MIN_POSITIONS = 16
+# 部位數達此門檻且已安裝 numba 時改用 JIT 編譯的 kernel
+JIT_MIN_POSITIONS = 32
+
+
+def _tick_kernel_numpy(entry, mult, sign, sl, tp, price):
+    """計算損益與停損/止盈觸發遮罩（NaN 比較為 False，未設定或無報價者不觸發）"""
+    pnl = (price - entry) * mult
+    with np.errstate(invalid="ignore"):
+        hit_sl = (price - sl) * sign <= 0
+        hit_tp = ~hit_sl & ((price - tp) * sign >= 0)
+    return pnl, hit_sl, hit_tp
+
+
+def _tick_kernel_loop(entry, mult, sign, sl, tp, price):
+    """與 _tick_kernel_numpy 相同的逐筆版本，供 numba 編譯"""
+    n = entry.shape[0]
+    pnl = np.empty(n)
+    hit_sl = np.zeros(n, dtype=np.bool_)
+    hit_tp = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        p = price[i]
+        pnl[i] = (p - entry[i]) * mult[i]
+        if (p - sl[i]) * sign[i] <= 0.0:
+            hit_sl[i] = True
+        elif (p - tp[i]) * sign[i] >= 0.0:
+            hit_tp[i] = True
+    return pnl, hit_sl, hit_tp
+
+
+# numba 為選用套件；不使用 fastmath，因為 kernel 依賴 NaN 比較語意
+try:
+    from numba import njit
+    _tick_kernel_jit = njit(cache=True)(_tick_kernel_loop)
+    _tick_kernel_jit(*([np.zeros(1)] * 6))  # 載入時先編譯，避免第一個 tick 付出 JIT 延遲
+except ImportError:
+    _tick_kernel_jit = None
 
 
 class PositionManager:
@@ -13,18 +56,34 @@ class PositionManager:
     
     def __init__(self, workspace_dir: Path):
         self.store = PositionStore(workspace_dir)
+        self._writes = WriteBehindBuffer(self.store)  # 合併短時間內的部位寫入
         self.positions: Dict[str, Position] = {}  # strategy_id -> Position
+        self._by_symbol: Dict[str, Set[str]] = defaultdict(set)  # symbol -> {strategy_id}
+        self._soa: Optional[Dict[str, Any]] = None  # 向量化用的欄位陣列，部位變動時失效
+        self._total_quantity = 0  # 所有部位總口數（開/平倉時維護）
         self._load_positions()
     
     def _load_positions(self) -> None:
         """載入部位"""
         positions_data = self.store.get_all_positions()
         
-        for data in positions_data:
-            if data.get("quantity", 0) > 0:  # 只載入有部位的
-                position = Position.from_dict(data)
-                self.positions[position.strategy_id] = position
-                logger.info(f"載入部位: {position.strategy_name} - {position.symbol} {position.direction} {position.quantity}口")
+        # 只載入有部位的
+        loaded = [Position.from_dict(data) for data in positions_data if data.get("quantity", 0) > 0]
+        
+        for position in loaded:
+            self.positions[position.strategy_id] = position
+            self._by_symbol[position.symbol].add(position.strategy_id)
+            self._total_quantity += position.quantity
+            logger.debug(
+                "載入部位: {} - {} {} {}口",
+                position.strategy_name, position.symbol, position.direction, position.quantity
+            )
+        
+        logger.info("載入 {} 個部位", len(loaded))
+    
+    def flush(self) -> None:
+        """立即寫入所有待處理的部位異動"""
+        self._writes.flush()
     
     def get_all_positions(self) -> List[Position]:
         """取得所有部位"""
@@ -36,19 +95,17 @@ class PositionManager:
     
     def get_position_by_symbol(self, symbol: str) -> Optional[Position]:
         """根據合約取得部位"""
-        for position in self.positions.values():
-            if position.symbol == symbol:
-                return position
+        for strategy_id in self._by_symbol.get(symbol, ()):
+            return self.positions[strategy_id]
         return None
     
     def has_position(self, strategy_id: str) -> bool:
-        """檢查是否有部位"""
-        position = self.positions.get(strategy_id)
-        return position is not None and position.quantity > 0
+        """檢查是否有部位（平倉時即移除，故存在即有部位）"""
+        return strategy_id in self.positions
     
     def get_total_quantity(self) -> int:
         """取得總口數"""
-        return sum(p.quantity for p in self.positions.values())
+        return self._total_quantity
     
     def open_position(
         self,
@@ -110,9 +167,15 @@ class PositionManager:
         )
         
         self.positions[strategy_id] = position
-        self.store.add_position(position.to_dict())
+        self._by_symbol[symbol].add(strategy_id)
+        self._total_quantity += quantity
+        self._soa = None
+        self._writes.queue("add_position", position.to_dict())
         
-        logger.info(f"開倉: {strategy_name} - {symbol} {direction} {quantity}口 @ {entry_price}, 停損: {stop_loss_price}, 止盈: {take_profit_price}")
+        logger.info(
+            "開倉: {} - {} {} {}口 @ {}, 停損: {}, 止盈: {}",
+            strategy_name, symbol, direction, quantity, entry_price, stop_loss_price, take_profit_price
+        )
         return position
     
     def close_position(self, strategy_id: str, exit_price: float) -> Optional[Dict]:
@@ -133,47 +196,128 @@ class PositionManager:
             "entry_price": position.entry_price,
             "exit_price": exit_price,
             "pnl": position.pnl,
-            "exit_time": datetime.now().isoformat()
+            "exit_time": now_iso()
         }
         
         # 更新儲存
-        self.store.update_position(strategy_id, {
-            "quantity": 0,
-            "exit_price": exit_price,
-            "exit_time": result["exit_time"],
-            "pnl": position.pnl
+        self._writes.queue("update_position", {
+            "strategy_id": strategy_id,
+            "updates": {
+                "quantity": 0,
+                "exit_price": exit_price,
+                "exit_time": result["exit_time"],
+                "pnl": position.pnl
+            }
         })
         
         # 移除記憶體中的部位
         del self.positions[strategy_id]
+        self._unindex(position.symbol, strategy_id)
+        self._total_quantity -= position.quantity
+        self._soa = None
         
-        logger.info(f"平倉: {position.strategy_name} - {position.symbol} @ {exit_price}, PnL: {position.pnl}")
+        logger.info("平倉: {} - {} @ {}, PnL: {}", position.strategy_name, position.symbol, exit_price, position.pnl)
         return result
     
+    def _unindex(self, symbol: str, strategy_id: str) -> None:
+        """從 symbol 索引移除策略"""
+        strategy_ids = self._by_symbol.get(symbol)
+        if strategy_ids is None:
+            return
+        strategy_ids.discard(strategy_id)
+        if not strategy_ids:
+            del self._by_symbol[symbol]
+    
     def update_prices(self, price_map: Dict[str, float]) -> List[Dict]:
-        """更新部位價格"""
+        """更新部位價格（只處理有部位的合約）"""
+        if len(self.positions) >= VECTORIZE_MIN_POSITIONS:
+            return self._update_prices_vectorized(price_map)
+        
         triggered = []
         
-        for strategy_id, position in self.positions.items():
-            current_price = price_map.get(position.symbol)
-            if current_price:
+        for symbol, current_price in price_map.items():
+            if not current_price:
+                continue
+            for strategy_id in self._by_symbol.get(symbol, ()):
+                position = self.positions[strategy_id]
                 position.calculate_pnl(current_price)
                 
                 # 檢查停損止盈
                 if position.check_stop_loss(current_price):
-                    triggered.append({
-                        "strategy_id": strategy_id,
-                        "type": "stop_loss",
-                        "reason": f"觸發停損 {position.stop_loss}",
-                        "exit_price": current_price
-                    })
+                    triggered.append(self._make_trigger(strategy_id, position, "stop_loss", current_price))
                 elif position.check_take_profit(current_price):
-                    triggered.append({
-                        "strategy_id": strategy_id,
-                        "type": "take_profit",
-                        "reason": f"觸發止盈 {position.take_profit}",
-                        "exit_price": current_price
-                    })
+                    triggered.append(self._make_trigger(strategy_id, position, "take_profit", current_price))
+        
+        return triggered
+    
+    @staticmethod
+    def _make_trigger(strategy_id: str, position: Position, trigger_type: str, exit_price: float) -> Dict:
+        """建立停損止盈觸發記錄"""
+        if trigger_type == "stop_loss":
+            reason = f"觸發停損 {position.stop_loss}"
+        else:
+            reason = f"觸發止盈 {position.take_profit}"
+        return {
+            "strategy_id": strategy_id,
+            "type": trigger_type,
+            "reason": reason,
+            "exit_price": exit_price
+        }
+    
+    def _build_soa(self) -> Dict[str, Any]:
+        """將部位攤平為欄位陣列 (Structure of Arrays)"""
+        strategy_ids = list(self.positions.keys())
+        positions = [self.positions[sid] for sid in strategy_ids]
+        symbols = list(self._by_symbol.keys())
+        symbol_idx = {symbol: i for i, symbol in enumerate(symbols)}
+        nan = float("nan")
+        
+        return {
+            "strategy_ids": strategy_ids,
+            "positions": positions,
+            "symbols": symbols,
+            "codes": np.fromiter((symbol_idx[p.symbol] for p in positions), dtype=np.intp, count=len(positions)),
+            "entry": np.fromiter((p._entry for p in positions), dtype=np.float64, count=len(positions)),
+            "mult": np.fromiter((p._pnl_mult for p in positions), dtype=np.float64, count=len(positions)),
+            "sign": np.fromiter((p._sign for p in positions), dtype=np.float64, count=len(positions)),
+            "sl": np.fromiter((nan if p._sl is None else p._sl for p in positions),
+                              dtype=np.float64, count=len(positions)),
+            "tp": np.fromiter((nan if p._tp is None else p._tp for p in positions),
+                              dtype=np.float64, count=len(positions)),
+        }
+    
+    def _update_prices_vectorized(self, price_map: Dict[str, float]) -> List[Dict]:
+        """以 NumPy 一次計算所有部位的損益與停損止盈"""
+        if self._soa is None:
+            self._soa = self._build_soa()
+        soa = self._soa
+        
+        # 每個合約一個價格，再依部位的合約代碼展開；無報價者為 NaN
+        symbol_prices = np.array(
+            [float(price_map.get(symbol) or "nan") for symbol in soa["symbols"]],
+            dtype=np.float64
+        )
+        prices = np.take(symbol_prices, soa["codes"])
+        valid = ~np.isnan(prices)
+        positions = soa["positions"]
+        
+        if _tick_kernel_jit is not None and len(positions) >= JIT_MIN_POSITIONS:
+            kernel = _tick_kernel_jit
+        else:
+            kernel = _tick_kernel_numpy
+        pnl, hit_sl, hit_tp = kernel(soa["entry"], soa["mult"], soa["sign"], soa["sl"], soa["tp"], prices)
+        
+        for i in np.nonzero(valid)[0].tolist():
+            position = positions[i]
+            position.current_price = float(prices[i])
+            position.pnl = float(pnl[i])
+        
+        triggered = []
+        for i in np.nonzero(hit_sl | hit_tp)[0].tolist():
+            trigger_type = "stop_loss" if hit_sl[i] else "take_profit"
+            triggered.append(self._make_trigger(
+                soa["strategy_ids"][i], positions[i], trigger_type, price_map[positions[i].symbol]
+            ))
         
         return triggered
     
@@ -1,18 +1,36 @@
 """策略類別"""
+import hashlib
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from src.storage.json_store import StrategyStore
 from src.storage.models import StrategyModel
+from src.trading.clock import now_iso
+
+# get_strategy_status 回傳的欄位（依輸出順序）
+STATUS_FIELDS = ("id", "name", "symbol", "enabled", "is_running", "last_signal", "last_signal_time")
+_STATUS_FIELD_SET = frozenset(STATUS_FIELDS)
 
 
 class Strategy:
     """策略類別"""
     
+    __slots__ = (
+        "id", "name", "symbol", "prompt", "params", "enabled", "created_at",
+        "direction", "goal", "goal_unit", "review_period", "review_unit",
+        "last_signal", "last_signal_time", "is_running", "rules", "rules_parsed_at",
+        "strategy_code", "strategy_class_name", "strategy_generated_at",
+        "strategy_version", "prompt_hash", "_prompt_ref", "verified",
+        "verification_status", "verification_error", "verification_attempts",
+        "verified_at", "_dict_cache", "_status_view",
+    )
+    
     def __init__(self, strategy_id: str, name: str, symbol: str, prompt: str, 
                  params: Dict[str, Any], enabled: bool = False,
                  goal: Optional[float] = None, goal_unit: str = "daily",
                  review_period: int = 5, review_unit: str = "day",
                  direction: str = "long"):
+        # 狀態檢視：狀態欄位賦值時由 __setattr__ 同步寫入
+        object.__setattr__(self, "_status_view", dict.fromkeys(STATUS_FIELDS))
         self.id = strategy_id
         self.name = name
         self.symbol = symbol
@@ -47,6 +65,8 @@ class Strategy:
         self.strategy_generated_at: Optional[str] = None
         self.strategy_version: int = 1
         self.prompt_hash: Optional[str] = None
+        # 產生策略程式碼時所用的 prompt（同一程序內以比對取代重算 MD5）
+        self._prompt_ref: Optional[str] = None
         
         # 驗證狀態
         self.verified: bool = False
@@ -55,8 +75,28 @@ class Strategy:
         self.verification_attempts: int = 0
         self.verified_at: Optional[str] = None
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        # 任何欄位變動都讓 to_dict 快照失效
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_dict_cache", None)
+        if name in _STATUS_FIELD_SET:
+            self._status_view[name] = value
+    
+    @property
+    def status_view(self) -> Dict[str, Any]:
+        """即時同步的狀態字典（共用物件，請勿修改）"""
+        return self._status_view
+    
     def to_dict(self) -> dict:
         """轉換為字典"""
+        cache = getattr(self, "_dict_cache", None)
+        if cache is None:
+            prompt_hash = self._get_prompt_hash()
+            cache = self._build_dict(prompt_hash)
+            object.__setattr__(self, "_dict_cache", cache)
+        return cache.copy()
+    
+    def _build_dict(self, prompt_hash: Optional[str]) -> dict:
         return {
             "id": self.id,
             "name": self.name,
@@ -78,7 +118,7 @@ class Strategy:
             "strategy_class_name": self.strategy_class_name,
             "strategy_generated_at": self.strategy_generated_at,
             "strategy_version": self.strategy_version,
-            "prompt_hash": self.prompt_hash,
+            "prompt_hash": prompt_hash,
             "verified": self.verified,
             "verification_status": self.verification_status,
             "verification_error": self.verification_error,
@@ -128,7 +168,7 @@ class Strategy:
     def update_last_signal(self, signal: str) -> None:
         """更新最後訊號"""
         self.last_signal = signal
-        self.last_signal_time = datetime.now().isoformat()
+        self.last_signal_time = now_iso()
     
     def set_rules(self, rules: Dict[str, Any]) -> None:
         """設定解析後的規則"""
@@ -146,19 +186,30 @@ class Strategy:
     
     def set_strategy_code(self, code: str, class_name: str) -> None:
         """設定 LLM 生成的策略程式碼"""
-        import hashlib
         self.strategy_code = code
         self.strategy_class_name = class_name
         self.strategy_generated_at = datetime.now().isoformat()
-        self.prompt_hash = hashlib.md5(self.prompt.encode()).hexdigest()
+        # MD5 只在序列化時才計算
+        self._prompt_ref = self.prompt
+        self.prompt_hash = None
+    
+    def _get_prompt_hash(self) -> Optional[str]:
+        """取得持久化用的 prompt MD5（延遲計算）"""
+        if self.prompt_hash is None and self._prompt_ref is not None:
+            self.prompt_hash = hashlib.md5(self._prompt_ref.encode()).hexdigest()
+        return self.prompt_hash
     
     def needs_regeneration(self) -> bool:
         """檢查是否需要重新生成策略"""
         if not self.strategy_code or not self.strategy_class_name:
             return True
-        import hashlib
-        current_hash = hashlib.md5(self.prompt.encode()).hexdigest()
-        return current_hash != self.prompt_hash
+        if self._prompt_ref is not None:
+            return self._prompt_ref is not self.prompt and self._prompt_ref != self.prompt
+        # 從檔案載入的策略：比對一次持久化的 MD5，相符則記住目前的 prompt
+        if hashlib.md5(self.prompt.encode()).hexdigest() != self.prompt_hash:
+            return True
+        self._prompt_ref = self.prompt
+        return False
     
     def has_valid_strategy_code(self) -> bool:
         """檢查是否有有效的策略程式碼"""
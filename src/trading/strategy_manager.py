@@ -1,11 +1,16 @@
 """策略管理器"""
-from typing import List, Optional, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Iterator, Set
 from pathlib import Path
 
 from src.logger import logger
 from src.trading.strategy import Strategy
 from src.storage.json_store import StrategyStore
 
+# 策略異動合併寫檔的視窗（秒）
+SAVE_FLUSH_INTERVAL = 0.05
+
 
 class StrategyManager:
     """策略管理器 - 管理3個策略"""
@@ -14,6 +19,16 @@ class StrategyManager:
         self.workspace_dir = workspace_dir
         self.store = StrategyStore(workspace_dir)
         self.strategies: Dict[str, Strategy] = {}
+        self._by_symbol: Dict[str, List[str]] = {}  # symbol -> [strategy_id]（依加入順序）
+        self._enabled: Dict[str, Strategy] = {}  # 已啟用策略，隨啟用/停用即時維護
+        # get_strategy_status 快取：策略新增/刪除時遞增版本；欄位變動直接反映在各策略的 status_view
+        self._status_version = 0
+        self._status_cache: tuple = (None, None)
+        # 延遲寫檔：待儲存的策略 ID，由計時器或 flush() 以當下狀態一次寫入
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._bulk_depth = 0
         self._load_strategies()
     
     def _load_strategies(self) -> None:
@@ -23,8 +38,55 @@ class StrategyManager:
         for data in strategies_data:
             strategy = Strategy.from_dict(data)
             self.strategies[strategy.id] = strategy
+            self._index(strategy)
+            self._sync_enabled(strategy)
             logger.info(f"載入策略: {strategy.name} ({strategy.symbol}) - {'啟用' if strategy.enabled else '停用'}")
     
+    def _mark_dirty(self, strategy_id: str) -> None:
+        """標記策略待儲存"""
+        with self._dirty_lock:
+            self._dirty.add(strategy_id)
+            if self._bulk_depth or self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(SAVE_FLUSH_INTERVAL, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self) -> None:
+        """立即寫入所有待儲存的策略"""
+        with self._dirty_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            dirty, self._dirty = self._dirty, set()
+            for strategy_id in dirty:
+                strategy = self.strategies.get(strategy_id)
+                if strategy is None:
+                    continue
+                try:
+                    self.store.save_strategy(strategy.to_dict())
+                except Exception as e:
+                    logger.error(f"❌ 儲存策略失敗 {strategy_id}: {e}")
+    
+    @contextmanager
+    def bulk(self) -> Iterator["StrategyManager"]:
+        """批次異動：區塊內的修改在離開時一次寫檔
+        
+        用法:
+            with strategy_mgr.bulk():
+                strategy_mgr.enable_strategy("a")
+                strategy_mgr.update_strategy("b", {...})
+        """
+        with self._dirty_lock:
+            self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            with self._dirty_lock:
+                self._bulk_depth -= 1
+                if self._bulk_depth == 0:
+                    self.flush()
+    
     def get_all_strategies(self) -> List[Strategy]:
         """取得所有策略"""
         return list(self.strategies.values())
@@ -35,19 +97,50 @@ class StrategyManager:
     
     def get_enabled_strategies(self) -> List[Strategy]:
         """取得所有啟用的策略"""
-        return [s for s in self.strategies.values() if s.enabled]
+        return list(self._enabled.values())
     
     def get_strategy_by_symbol(self, symbol: str) -> Optional[Strategy]:
-        """根據合約代碼取得策略"""
-        for strategy in self.strategies.values():
-            if strategy.symbol in symbol:
-                return strategy
-        return None
+        """根據合約代碼取得策略（如 TXF 或內含代碼的 TXFG4）"""
+        strategy_ids = self._by_symbol.get(symbol)
+        if strategy_ids is None:
+            # 合約代碼內含商品代碼時，以最長的商品代碼優先比對
+            for prefix in sorted(self._by_symbol, key=len, reverse=True):
+                if prefix in symbol:
+                    strategy_ids = self._by_symbol[prefix]
+                    break
+            else:
+                return None
+        return self.strategies[strategy_ids[0]]
+    
+    def _index(self, strategy: Strategy) -> None:
+        """加入 symbol 索引"""
+        self._by_symbol.setdefault(strategy.symbol, []).append(strategy.id)
+    
+    def _sync_enabled(self, strategy: Strategy) -> None:
+        """依 enabled 狀態更新啟用索引"""
+        if strategy.enabled:
+            self._enabled[strategy.id] = strategy
+        else:
+            self._enabled.pop(strategy.id, None)
+    
+    def _unindex(self, strategy_id: str, symbol: str) -> None:
+        """從 symbol 索引移除"""
+        strategy_ids = self._by_symbol.get(symbol)
+        if strategy_ids and strategy_id in strategy_ids:
+            strategy_ids.remove(strategy_id)
+            if not strategy_ids:
+                del self._by_symbol[symbol]
     
     def add_strategy(self, strategy: Strategy) -> None:
         """新增策略"""
+        old = self.strategies.get(strategy.id)
+        if old is not None:
+            self._unindex(old.id, old.symbol)
         self.strategies[strategy.id] = strategy
-        self.store.save_strategy(strategy.to_dict())
+        self._index(strategy)
+        self._sync_enabled(strategy)
+        self._status_version += 1
+        self._mark_dirty(strategy.id)
         logger.info(f"新增策略: {strategy.name}")
     
     def update_strategy(self, strategy_id: str, updates: Dict[str, Any]) -> bool:
@@ -56,11 +149,18 @@ class StrategyManager:
         if not strategy:
             return False
         
+        old_symbol = strategy.symbol
         for key, value in updates.items():
             if hasattr(strategy, key):
                 setattr(strategy, key, value)
         
-        self.store.save_strategy(strategy.to_dict())
+        if strategy.symbol != old_symbol:
+            self._unindex(strategy_id, old_symbol)
+            self._index(strategy)
+        if "enabled" in updates:
+            self._sync_enabled(strategy)
+        
+        self._mark_dirty(strategy_id)
         logger.info(f"更新策略: {strategy.name}")
         return True
     
@@ -71,7 +171,8 @@ class StrategyManager:
             return False
         
         strategy.enabled = True
-        self.store.enable_strategy(strategy_id)
+        self._enabled[strategy_id] = strategy
+        self._mark_dirty(strategy_id)
         logger.info(f"啟用策略: {strategy.name}")
         return True
     
@@ -83,7 +184,8 @@ class StrategyManager:
         
         strategy.enabled = False
         strategy.is_running = False
-        self.store.disable_strategy(strategy_id)
+        self._enabled.pop(strategy_id, None)
+        self._mark_dirty(strategy_id)
         logger.info(f"停用策略: {strategy.name}")
         return True
     
@@ -153,7 +255,12 @@ class StrategyManager:
             return False
         
         strategy = self.strategies[strategy_id]
+        with self._dirty_lock:
+            self._dirty.discard(strategy_id)
         del self.strategies[strategy_id]
+        self._enabled.pop(strategy_id, None)
+        self._unindex(strategy_id, strategy.symbol)
+        self._status_version += 1
         
         # 從儲存中刪除（包括策略、部位、訂單、訊號檔案）
         self.store.delete_strategy(strategy_id)
@@ -162,20 +269,23 @@ class StrategyManager:
     
     def reload_strategies(self) -> None:
         """重新載入策略"""
+        self.flush()
         self.strategies.clear()
+        self._by_symbol.clear()
+        self._enabled.clear()
+        self._status_version += 1
         self._load_strategies()
     
     def get_strategy_status(self) -> List[Dict[str, Any]]:
-        """取得所有策略狀態"""
-        return [
-            {
-                "id": s.id,
-                "name": s.name,
-                "symbol": s.symbol,
-                "enabled": s.enabled,
-                "is_running": s.is_running,
-                "last_signal": s.last_signal,
-                "last_signal_time": s.last_signal_time
-            }
-            for s in self.strategies.values()
-        ]
+        """取得所有策略狀態
+        
+        回傳各策略的 status_view 參照，欄位變動會即時反映；
+        策略集合沒變動時直接回傳上次的串列（共用物件，呼叫端請勿修改）。
+        """
+        payload, cached_version = self._status_cache
+        if cached_version == self._status_version:
+            return payload
+        
+        payload = [s.status_view for s in self.strategies.values()]
+        self._status_cache = (payload, self._status_version)
+        return payload
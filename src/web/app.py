@@ -1,7 +1,24 @@
 """Web Interface Flask Application"""
+import asyncio
+import os
+import queue
+import threading
+
 from flask import Flask, render_template
 from loguru import logger
 
+# 選用：回應 gzip 壓縮；未安裝時照常以未壓縮內容回應
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+# /workspace 目錄（專案根目錄下），與 routes/backtest.py 的 WORKSPACE_DIR 相同
+WORKSPACE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'workspace')
+
+# /workspace 靜態檔案的快取秒數
+WORKSPACE_MAX_AGE = 3600
+
 
 def create_web_app(trading_tools, llm_provider=None, data_updater=None, connection_mgr=None, strategy_runner=None):
     """建立 Flask 應用
@@ -17,12 +34,33 @@ def create_web_app(trading_tools, llm_provider=None, data_updater=None, connecti
         Flask 應用
     """
     # 修復 async/await 在 Flask 中的 event loop 問題
+    # 仍需保留：TradingTools 部分路徑會在主 event loop 內呼叫 asyncio.run()
     import nest_asyncio
     nest_asyncio.apply()
     
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'aisots-web-secret-key'
     
+    # 有 orjson 時以其序列化所有 jsonify 回應，其次 ujson；都沒有時沿用預設但不轉義中文
+    from src.web import json_provider
+    if json_provider.orjson is not None:
+        app.json = json_provider.OrjsonProvider(app)
+    elif json_provider.ujson is not None:
+        app.json = json_provider.UjsonProvider(app)
+    else:
+        app.json.ensure_ascii = False
+    
+    # JSON/HTML 回應以 gzip 壓縮（level 4 在速度與壓縮率間取平衡，小於 1KB 不壓縮）
+    # /workspace 與 static 檔案走 send_file（direct_passthrough），不受影響
+    if Compress is not None:
+        app.config.update(
+            COMPRESS_MIMETYPES=["application/json", "text/html"],
+            COMPRESS_MIN_SIZE=1024,
+            COMPRESS_LEVEL=4,
+            COMPRESS_ALGORITHM="gzip",
+        )
+        Compress(app)
+    
     # 儲存引用
     app.trading_tools = trading_tools
     app.llm_provider = llm_provider
@@ -30,6 +68,39 @@ def create_web_app(trading_tools, llm_provider=None, data_updater=None, connecti
     app.connection_mgr = connection_mgr
     app.strategy_runner = strategy_runner
     
+    # 可重複使用的 event loop 池
+    # werkzeug 每個請求開一條新執行緒，thread-local 的 loop 無法被重用，
+    # 因此改為借還式：同一時間一個 loop 只給一條執行緒使用
+    loop_pool = queue.SimpleQueue()
+    
+    def run_async(coro):
+        """在池中的 event loop 上執行協程並回傳結果（取代每次 asyncio.run 建立新 loop）"""
+        try:
+            loop = loop_pool.get_nowait()
+        except queue.Empty:
+            loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop_pool.put(loop)
+    
+    app.run_async = run_async
+    
+    # 常駐背景 event loop：給純非同步 I/O（如 LLM HTTP 呼叫）共用，
+    # 多個請求的協程可在同一 loop 上並行；協程內含阻塞呼叫者請改用 run_async
+    io_loop = asyncio.new_event_loop()
+    threading.Thread(target=io_loop.run_forever, name="web-io-loop", daemon=True).start()
+    
+    def run_io(coro, timeout=None):
+        """將協程交給背景 event loop 執行並等待結果"""
+        return asyncio.run_coroutine_threadsafe(coro, io_loop).result(timeout=timeout)
+    
+    app.run_io = run_io
+    
+    # 每個策略一把回測鎖：同一策略的回測依序執行，不同策略可並行
+    app.lock_map = {}
+    app.lock_map_guard = threading.Lock()
+    
 
     
     # 註冊路由
@@ -56,15 +127,18 @@ def create_web_app(trading_tools, llm_provider=None, data_updater=None, connecti
     app.register_blueprint(chart.bp)
     
     # 提供 workspace 目录下的文件访问（如回测图表）
-    import os
     from flask import send_from_directory
     
-    workspace_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'workspace')
-    
     @app.route('/workspace/<path:filename>')
     def serve_workspace(filename):
         """提供 workspace 目录下的文件"""
-        return send_from_directory(workspace_path, filename)
+        # 回測檔名帶時間戳，內容不會再變；開啟 ETag/Last-Modified，重新整理時回 304
+        resp = send_from_directory(
+            WORKSPACE_PATH, filename,
+            conditional=True, etag=True, max_age=WORKSPACE_MAX_AGE
+        )
+        resp.cache_control.public = True
+        return resp
     
     @app.route('/')
     def index():
@@ -0,0 +1,84 @@
+"""條件式 GET - 以資料版本產生弱 ETag，資料未變動時回 304"""
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import Response, current_app, request
+
+# 儀表板輪詢間隔內允許瀏覽器直接使用本地副本（秒）
+POLL_MAX_AGE = 2
+
+
+def make_etag(*parts: Any) -> str:
+    """由資料版本等鍵值產生 ETag（不需序列化回應內容）"""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def not_modified(etag: str) -> Optional[Response]:
+    """用戶端的 If-None-Match 命中時回傳 304 回應，否則回傳 None"""
+    if_none_match = request.if_none_match
+    # Flask-Compress 壓縮後會把 ETag 改為 "<etag>:gzip"，比對時去掉演算法後綴
+    if not (
+        if_none_match.contains_weak(etag)
+        or etag in {tag.split(":", 1)[0] for tag in if_none_match.as_set(include_weak=True)}
+    ):
+        return None
+    return with_etag(current_app.response_class(status=304), etag)
+
+
+def with_etag(response: Response, etag: str, max_age: int = POLL_MAX_AGE) -> Response:
+    """為回應加上弱 ETag 與私有快取標頭"""
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response
+
+
+class PayloadCache:
+    """短時間快取序列化後的回應內容與其 ETag（給輪詢頻繁、組裝成本較高的端點）
+
+    快取鍵來自查詢參數，寫入時會清除過期項目並限制項目數，避免任意參數值讓記憶體無限成長。
+    """
+
+    def __init__(self, ttl: float = 0.5, maxsize: int = 64):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Any, Tuple[float, str, str]] = {}  # key -> (expires_at, etag, body)
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Any, build: Callable[[], str]) -> Tuple[str, str]:
+        """回傳 (etag, body)；過期時呼叫 build() 重新產生，ETag 取自內容"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1], entry[2]
+
+        body = build()
+        etag = hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._prune(now)
+            self._entries[key] = (now + self.ttl, etag, body)
+        return etag, body
+
+    def _prune(self, now: float) -> None:
+        """移除過期項目；仍超過上限時淘汰最早寫入的項目（呼叫端需持有 _lock）"""
+        for key in [k for k, entry in self._entries.items() if entry[0] <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def cached_json(cache: PayloadCache, key: Any, build: Callable[[], Any]) -> Response:
+    """以 PayloadCache 回應 JSON：內容未變時回 304，否則直接送出快取的內容"""
+    etag, body = cache.get_or_build(key, lambda: current_app.json.dumps(build()))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return with_etag(current_app.response_class(body, mimetype="application/json"), etag)
@@ -0,0 +1,71 @@
+"""Flask JSON Provider - 以 orjson（或 ujson）序列化 API 回應"""
+import dataclasses
+import decimal
+from datetime import date
+from typing import Any, Union
+
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+# orjson 為 C 擴充，序列化速度遠快於標準 json；未安裝時沿用 Flask 預設 provider
+try:
+    import orjson
+    # datetime 交給 _default，維持 Flask 預設的 HTTP 日期格式
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+except ImportError:
+    orjson = None
+
+# orjson 無法安裝的平台（如 ARM32）退而使用 ujson
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _default(o: Any) -> Any:
+    """orjson 無法直接處理的型別（與 Flask DefaultJSONProvider 相同規則）"""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    if hasattr(o, "tolist"):
+        # numpy 純量/陣列（orjson 已原生處理，ujson 需轉換）
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """以 orjson 實作的 JSON Provider，jsonify() 呼叫端不需修改"""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # 直接輸出 bytes，省去 decode 再 encode
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class UjsonProvider(JSONProvider):
+    """以 ujson 實作的 JSON Provider（orjson 不可用時的備案）"""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # 中文不轉義為 \uXXXX，回應體積較小
+        return ujson.dumps(obj, ensure_ascii=False, default=_default)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return ujson.loads(s)
@@ -0,0 +1,99 @@
+"""LLM 回應快取 - 相同輸入在有效期限內直接回傳先前的回應"""
+import concurrent.futures
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# 預設容量與有效期限（秒）
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL = 24 * 3600
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# 中日韓文字與全形標點（含全形空白）
+_CJK = "\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef"
+# 緊鄰中日韓字元的空白（不會把兩個英數詞接在一起）
+_CJK_SPACE_RE = re.compile(f"(?<=[{_CJK}]) | (?=[{_CJK}])")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """正規化使用者輸入：連續空白合併為一個、去除首尾空白並轉小寫
+
+    中文輸入常見「每日賺 500 元」與「每日賺500元」這類只差空白的寫法，緊鄰中文字的空白一併去除，
+    視為同一提示；英數詞之間的空白保留，「RSI 14 30」與「RSI 143 0」不會被視為相同。
+    """
+    collapsed = _WHITESPACE_RE.sub(" ", prompt).strip().lower()
+    return _CJK_SPACE_RE.sub("", collapsed)
+
+
+def make_key(**fields: Any) -> str:
+    """由請求欄位產生快取鍵（sha256）"""
+    raw = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """有容量上限與有效期限的 LRU 快取（執行緒安全）"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """取得快取值，不存在或已過期時回傳 None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """寫入快取，超過容量時淘汰最久未使用的項目"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """合併同一鍵的並行呼叫：第一個呼叫者實際執行，其餘等待並共用同一結果"""
+
+    def __init__(self):
+        self._calls: dict = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
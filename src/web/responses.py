@@ -0,0 +1,47 @@
+"""API 回應輔助 - 統一 {"success": ...} 外層格式，直接交給 app.json 產生回應"""
+from typing import Any, List
+
+from flask import Response, current_app
+from werkzeug.exceptions import HTTPException
+
+_NO_DATA = object()
+
+
+def ok(data: Any = _NO_DATA, **extra: Any) -> Response:
+    """成功回應：{"success": true, "data": data, **extra}，未提供 data 時不含該欄位"""
+    payload = {"success": True}
+    if data is not _NO_DATA:
+        payload["data"] = data
+    payload.update(extra)
+    return current_app.json.response(payload)
+
+
+def err(error: Any, status: int = 500):
+    """失敗回應：{"success": false, "error": "..."} 與 HTTP 狀態碼"""
+    return current_app.json.response({"success": False, "error": str(error)}), status
+
+
+def action_result(success: bool, message: str) -> Response:
+    """操作結果回應：{"success": ..., "message": "..."}"""
+    return current_app.json.response({"success": success, "message": message})
+
+
+def confirm_needed(title: str, message: str, position: dict, risks: List[str]) -> Response:
+    """需要使用者確認的回應（前端依 needs_confirmation 顯示確認視窗）"""
+    return current_app.json.response({
+        "needs_confirmation": True,
+        "title": title,
+        "message": message,
+        "position": position,
+        "risks": risks
+    })
+
+
+def handle_api_error(e: Exception):
+    """API Blueprint 的例外處理：統一回 {"success": false, "error": ...}
+
+    HTTPException（如 request.get_json() 的 400）沿用其狀態碼，其餘為 500。
+    """
+    if isinstance(e, HTTPException):
+        return err(e.description, e.code)
+    return err(e)
@@ -1,7 +1,10 @@
 """Backtest API Routes"""
 from flask import Blueprint, jsonify, current_app, request
 from pathlib import Path
+from typing import Optional
+import os
 import re
+import threading
 from datetime import datetime
 
 from src.engine.backtest_engine import InsufficientDataError
@@ -10,6 +13,106 @@ bp = Blueprint('backtest', __name__, url_prefix='/api/backtest')
 
 # 獲取工作區路徑（相對於當前檔案）
 WORKSPACE_DIR = Path(__file__).parent.parent.parent.parent / "workspace"
+BACKTEST_DIR = WORKSPACE_DIR / "backtests"
+
+_TS_RE = re.compile(r'_(\d{14})\.html$')
+
+# 字串結果的錯誤標記，一次掃描取代逐一 in 判斷
+_ERR_RE = re.compile(r"❌ 回測失敗|錯誤|[Ee]rror|ERROR")
+
+
+def _parse_report_time(html_path: Path):
+    """從檔名解析回測時間，無法解析時回傳 None"""
+    # 檔名格式: {strategy_id}_v{version}_{YYYYMMDDHHMMSS}.html，先直接切字串
+    ts = html_path.stem.rsplit('_', 1)[-1]
+    if len(ts) != 14 or not ts.isdigit():
+        timestamp_match = _TS_RE.search(html_path.name)
+        if not timestamp_match:
+            return None
+        ts = timestamp_match.group(1)
+    return datetime.strptime(ts, "%Y%m%d%H%M%S")
+
+
+def _to_workspace_url(path: str) -> str:
+    """將檔案路徑轉為 /workspace/... URL（取 workspace/ 之後的部分）"""
+    path = path.replace("\\", "/")
+    _, sep, tail = path.partition("workspace/")
+    if sep:
+        return "/workspace/" + tail
+    return "/workspace/backtests/" + path.rsplit("/", 1)[-1]
+
+
+def _offload_report(html_path: Path, report: str) -> Optional[str]:
+    """確保回測文字報告已存成與圖表同名的 .txt，回傳其 URL（失敗時回傳 None）"""
+    report_file = html_path.with_suffix('.txt')
+    try:
+        if not report_file.exists():
+            tmp_path = report_file.with_suffix('.txt.tmp')
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(report)
+            os.replace(tmp_path, report_file)
+    except OSError:
+        return None
+    return _to_workspace_url(str(report_file))
+
+
+def _get_strategy_lock(strategy_id: str) -> threading.Lock:
+    """取得策略專屬的回測鎖"""
+    with current_app.lock_map_guard:
+        return current_app.lock_map.setdefault(strategy_id, threading.Lock())
+
+
+def _get_report_index() -> dict:
+    """取得 (strategy_id, version) -> (目錄 mtime, 最新 HTML, 回測時間) 索引"""
+    index = getattr(current_app, "latest_reports", None)
+    if index is None:
+        index = {}
+        current_app.latest_reports = index
+    return index
+
+
+def _find_latest_report(strategy_id: str, version: int):
+    """找出策略該版本最新的回測 HTML
+    
+    目錄 mtime 未變（沒有新增/刪除檔案）時直接使用索引，只需一次 stat()。
+    
+    Returns:
+        (html_path, report_time)，沒有報告時 html_path 為 None
+    """
+    dir_mtime = BACKTEST_DIR.stat().st_mtime_ns
+    index = _get_report_index()
+    key = (strategy_id, version)
+    
+    cached = index.get(key)
+    if cached is not None and cached[0] == dir_mtime:
+        return cached[1], cached[2]
+    
+    # 檔名格式: {strategy_id}_v{version}_{timestamp}.html
+    # 單次 scandir 完成比對與 stat，不經 fnmatch 也不建立中間串列
+    prefix = f"{strategy_id}_v{version}_"
+    latest_entry = None
+    latest_mtime = -1.0
+    with os.scandir(BACKTEST_DIR) as it:
+        for entry in it:
+            name = entry.name
+            if name.endswith(".html") and name.startswith(prefix):
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest_mtime = mtime
+                    latest_entry = entry
+    latest_html = Path(latest_entry.path) if latest_entry is not None else None
+    report_time = _parse_report_time(latest_html) if latest_html else None
+    
+    index[key] = (dir_mtime, latest_html, report_time)
+    return latest_html, report_time
+
+
+def _remember_report(strategy_id: str, version: int, html_path: Path) -> None:
+    """回測產生新報告後更新索引"""
+    if html_path.exists():
+        _get_report_index()[(strategy_id, version)] = (
+            BACKTEST_DIR.stat().st_mtime_ns, html_path, _parse_report_time(html_path)
+        )
 
 
 @bp.route('/<strategy_id>/check', methods=['GET'])
@@ -31,39 +134,26 @@ def check_backtest(strategy_id):
         strategy_name = getattr(strategy, 'name', strategy_id)
         
         # 檢查回測目錄（使用絕對路徑）
-        backtest_dir = WORKSPACE_DIR / "backtests"
-        if not backtest_dir.exists():
+        if not BACKTEST_DIR.exists():
             return jsonify({
                 "has_report": False,
                 "message": "沒有回測記錄"
             })
         
-        # 查找該策略該版本的回測檔案
-        # 檔名格式: {strategy_id}_v{version}_{timestamp}.html
-        pattern = f"{strategy_id}_v{version}_*.html"
-        matching_files = list(backtest_dir.glob(pattern))
+        # 查找該策略該版本最新的回測檔案
+        latest_html, report_time = _find_latest_report(strategy_id, version)
         
-        if not matching_files:
+        if latest_html is None:
             return jsonify({
                 "has_report": False,
                 "message": "沒有找到該版本的回測報告"
             })
         
-        # 找出最新的 HTML 檔案
-        latest_html = max(matching_files, key=lambda f: f.stat().st_mtime)
-        
         # 嘗試查找對應的文字報告檔案（.txt）
         report_file = latest_html.with_suffix('.txt')
         has_text_report = report_file.exists()
         
-        # 解析時間戳
-        filename = latest_html.name
-        timestamp_match = re.search(r'_(\d{14})\.html$', filename)
-        
-        if timestamp_match:
-            timestamp_str = timestamp_match.group(1)
-            report_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
-            
+        if report_time is not None:
             # 計算時間差
             time_diff = datetime.now() - report_time
             if time_diff.days > 0:
@@ -77,21 +167,10 @@ def check_backtest(strategy_id):
             report_time = datetime.fromtimestamp(latest_html.stat().st_mtime)
         
         # 轉換為 URL 路徑（相對於工作區）
-        # 從絕對路徑中提取 workspace 之後的部分，並添加 /workspace/ 前綴
-        chart_path = str(latest_html).replace("\\", "/")
-        if "workspace/" in chart_path:
-            chart_url = "/workspace/" + chart_path.split("workspace/", 1)[1]
-        else:
-            chart_url = "/workspace/backtests/" + latest_html.name
+        chart_url = _to_workspace_url(str(latest_html))
         
         # 文字報告路徑
-        report_url = None
-        if has_text_report:
-            report_path = str(report_file).replace("\\", "/")
-            if "workspace/" in report_path:
-                report_url = "/workspace/" + report_path.split("workspace/", 1)[1]
-            else:
-                report_url = "/workspace/backtests/" + report_file.name
+        report_url = _to_workspace_url(str(report_file)) if has_text_report else None
         
         return jsonify({
             "has_report": True,
@@ -122,7 +201,8 @@ def run_backtest(strategy_id):
         
         # 處理 InsufficientDataError
         try:
-            result = tools.backtest_strategy(strategy_id, use_mock=use_mock)
+            with _get_strategy_lock(strategy_id):
+                result = tools.backtest_strategy(strategy_id, use_mock=use_mock)
         except InsufficientDataError as e:
             return jsonify({
                 "needs_confirmation": True,
@@ -144,23 +224,32 @@ def run_backtest(strategy_id):
             # 修復：將相對路徑轉換為 URL 路徑
             chart_path = result.get("chart_path")
             chart_url = None
+            report = result.get("report", "")
+            report_url = None
+            if chart_path and not has_error:
+                html_path = BACKTEST_DIR / Path(chart_path).name
+                strategy = tools.strategy_mgr.get_strategy(strategy_id)
+                if strategy:
+                    _remember_report(strategy_id, getattr(strategy, "strategy_version", 1), html_path)
+                # 文字報告改由前端透過 /workspace 靜態路由讀取，不內嵌於 JSON
+                if has_report:
+                    report_url = _offload_report(html_path, report)
+                    if report_url:
+                        report = ""
             if chart_path:
                 # 確保路徑格式為 /workspace/...
-                chart_path = chart_path.replace("\\", "/").lstrip("/")
-                if not chart_path.startswith("workspace/"):
-                    chart_path = "workspace/" + chart_path
-                chart_url = "/" + chart_path
+                chart_url = _to_workspace_url(chart_path)
             
             return jsonify({
                 "success": not has_error and has_report,
-                "report": result.get("report", ""),
+                "report": report,
+                "report_path": report_url,
                 "chart_path": chart_url,
                 "error": result.get("error") if has_error else None
             })
         else:
             # 字符串格式的結果
-            error_markers = ["❌ 回測失敗", "錯誤", "error", "Error", "ERROR"]
-            has_error = any(marker in str(result) for marker in error_markers)
+            has_error = _ERR_RE.search(str(result)) is not None
             
             return jsonify({
                 "success": not has_error,
@@ -1,4 +1,10 @@
 """Config API Routes"""
+import copy
+import functools
+import hashlib
+import os
+import tempfile
+import threading
 import yaml
 from pathlib import Path
 from flask import Blueprint, jsonify, request
@@ -7,21 +13,88 @@ bp = Blueprint('config', __name__, url_prefix='/api/config')
 
 CONFIG_PATH = "config.yaml"
 
+# 有 libyaml 時使用 C 實作的 Loader/Dumper
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# 解析結果快取，config.yaml 的 mtime 變動時才重新解析；digest 為檔案內容摘要
+_CACHE = {"mtime": None, "data": None, "digest": None}
+_SAVE_LOCK = threading.Lock()
+
+
+def _digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
 
 def load_config_yaml():
-    """載入 config.yaml"""
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    """載入 config.yaml（回傳副本，呼叫端可自由修改）"""
+    mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    if mtime != _CACHE["mtime"]:
+        with open(CONFIG_PATH, "rb") as f:
+            raw = f.read()
+        _CACHE["data"] = yaml.load(raw, Loader=_YAML_LOADER)
+        _CACHE["digest"] = _digest(raw)
+        _CACHE["mtime"] = mtime
+    return copy.deepcopy(_CACHE["data"])
 
 
 def save_config_yaml(data):
-    """儲存 config.yaml"""
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        yaml.dump(data, f, allow_unicode=True, default_flow_style=False)
+    """儲存 config.yaml
+    
+    先在記憶體序列化再一次寫入暫存檔，fsync 後以 os.replace 原子替換，
+    避免寫到一半中斷時留下不完整的設定檔。序列化結果與現有檔案相同時不寫檔。
+    
+    Returns:
+        是否實際寫入
+    """
+    raw = yaml.dump(data, Dumper=_YAML_DUMPER, allow_unicode=True, default_flow_style=False, sort_keys=False).encode("utf-8")
+    digest = _digest(raw)
+    # 多執行緒伺服器上可能同時有多個儲存請求：每次寫入使用唯一暫存檔，替換與快取更新在鎖內完成
+    with _SAVE_LOCK:
+        if digest == _CACHE["digest"]:
+            return False
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(os.path.abspath(CONFIG_PATH)), prefix=".config.", suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.replace(tmp_path, CONFIG_PATH)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+        _CACHE["data"] = copy.deepcopy(data)
+        _CACHE["digest"] = digest
+        _CACHE["mtime"] = os.stat(CONFIG_PATH).st_mtime_ns
+    return True
+
+
+# update_config 可更新的欄位；SECRET 欄位只有在傳入非空值時才覆寫
+SECRET = "secret"
+VALUE = "value"
+
+UPDATE_SCHEMA = {
+    "shioaji": {"api_key": SECRET, "secret_key": SECRET, "simulation": VALUE},
+    "llm": {
+        "api_key": SECRET, "provider": VALUE, "model": VALUE,
+        "temperature": VALUE, "max_tokens": VALUE, "base_url": VALUE,
+    },
+    "telegram": {"bot_token": SECRET, "enabled": VALUE, "chat_id": VALUE},
+    "risk": {
+        "max_daily_loss": VALUE, "max_position": VALUE, "max_orders_per_minute": VALUE,
+        "enable_stop_loss": VALUE, "enable_take_profit": VALUE,
+    },
+    "trading": {"check_interval": VALUE, "stale_order_timeout": VALUE, "trading_hours": VALUE},
+    "web": {"enabled": VALUE, "host": VALUE, "port": VALUE},
+    "data_update": {"enabled": VALUE, "initial_fetch": VALUE, "storage": VALUE},
+}
 
 
+@functools.lru_cache(maxsize=128)
 def mask_sensitive(value):
-    """隱藏敏感資訊"""
+    """隱藏敏感資訊（金鑰很少變動，結果直接快取）"""
     if value and len(value) > 4:
         return value[:2] + "****" + value[-2:]
     return "******"
@@ -103,94 +176,26 @@ def update_config():
         
         config = load_config_yaml()
         
-        if "shioaji" in data:
-            shioaji_data = data["shioaji"]
-            current = config.get("shioaji", {})
-            if shioaji_data.get("api_key"):
-                current["api_key"] = shioaji_data["api_key"]
-            if shioaji_data.get("secret_key"):
-                current["secret_key"] = shioaji_data["secret_key"]
-            if "simulation" in shioaji_data:
-                current["simulation"] = shioaji_data["simulation"]
-            config["shioaji"] = current
+        for section, fields in UPDATE_SCHEMA.items():
+            if section not in data:
+                continue
+            section_data = data[section]
+            current = config.get(section, {})
+            for key, kind in fields.items():
+                if kind == SECRET:
+                    # 敏感欄位留空表示不修改
+                    if section_data.get(key):
+                        current[key] = section_data[key]
+                elif key in section_data:
+                    current[key] = section_data[key]
+            config[section] = current
         
-        if "llm" in data:
-            llm_data = data["llm"]
-            current = config.get("llm", {})
-            if llm_data.get("api_key"):
-                current["api_key"] = llm_data["api_key"]
-            if "provider" in llm_data:
-                current["provider"] = llm_data["provider"]
-            if "model" in llm_data:
-                current["model"] = llm_data["model"]
-            if "temperature" in llm_data:
-                current["temperature"] = llm_data["temperature"]
-            if "max_tokens" in llm_data:
-                current["max_tokens"] = llm_data["max_tokens"]
-            if "base_url" in llm_data:
-                current["base_url"] = llm_data["base_url"]
-            config["llm"] = current
-        
-        if "telegram" in data:
-            telegram_data = data["telegram"]
-            current = config.get("telegram", {})
-            if telegram_data.get("bot_token"):
-                current["bot_token"] = telegram_data["bot_token"]
-            if "enabled" in telegram_data:
-                current["enabled"] = telegram_data["enabled"]
-            if "chat_id" in telegram_data:
-                current["chat_id"] = telegram_data["chat_id"]
-            config["telegram"] = current
-        
-        if "risk" in data:
-            risk_data = data["risk"]
-            current = config.get("risk", {})
-            if "max_daily_loss" in risk_data:
-                current["max_daily_loss"] = risk_data["max_daily_loss"]
-            if "max_position" in risk_data:
-                current["max_position"] = risk_data["max_position"]
-            if "max_orders_per_minute" in risk_data:
-                current["max_orders_per_minute"] = risk_data["max_orders_per_minute"]
-            if "enable_stop_loss" in risk_data:
-                current["enable_stop_loss"] = risk_data["enable_stop_loss"]
-            if "enable_take_profit" in risk_data:
-                current["enable_take_profit"] = risk_data["enable_take_profit"]
-            config["risk"] = current
-        
-        if "trading" in data:
-            trading_data = data["trading"]
-            current = config.get("trading", {})
-            if "check_interval" in trading_data:
-                current["check_interval"] = trading_data["check_interval"]
-            if "stale_order_timeout" in trading_data:
-                current["stale_order_timeout"] = trading_data["stale_order_timeout"]
-            if "trading_hours" in trading_data:
-                current["trading_hours"] = trading_data["trading_hours"]
-            config["trading"] = current
-        
-        if "web" in data:
-            web_data = data["web"]
-            current = config.get("web", {})
-            if "enabled" in web_data:
-                current["enabled"] = web_data["enabled"]
-            if "host" in web_data:
-                current["host"] = web_data["host"]
-            if "port" in web_data:
-                current["port"] = web_data["port"]
-            config["web"] = current
-        
-        if "data_update" in data:
-            data_update = data["data_update"]
-            current = config.get("data_update", {})
-            if "enabled" in data_update:
-                current["enabled"] = data_update["enabled"]
-            if "initial_fetch" in data_update:
-                current["initial_fetch"] = data_update["initial_fetch"]
-            if "storage" in data_update:
-                current["storage"] = data_update["storage"]
-            config["data_update"] = current
-        
-        save_config_yaml(config)
+        # 內容沒有變化時不必重新序列化與寫檔；序列化後與檔案相同也不寫
+        if config == _CACHE["data"] or not save_config_yaml(config):
+            return jsonify({
+                "success": True,
+                "message": "設定未變更"
+            })
         
         return jsonify({
             "success": True,
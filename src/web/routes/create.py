@@ -1,14 +1,113 @@
 from flask import Blueprint, render_template, request, jsonify, Response
 from functools import wraps
-import asyncio
 import logging
 import json
 import re
+from pathlib import Path
+from typing import Optional
+
+from src.web.app import WORKSPACE_PATH
+from src.web.llm_cache import LLMResponseCache, SingleFlight, make_key, normalize_prompt
 
 logger = logging.getLogger(__name__)
 
 create_bp = Blueprint('create', __name__)
 
+# 等待 LLM 回應的上限（秒），略大於 provider 本身的 HTTP timeout
+LLM_TIMEOUT = 150
+
+# preview 的系統提示（固定內容），變動欄位放在最後的 user 訊息，
+# 讓 provider 端的 prompt cache 能以前綴命中
+_STRATEGY_SYSTEM_PREFIX = """你是一個專業的期貨交易策略分析師。請根據用戶的需求設計完整的交易策略。
+
+## ⚠️ 重要：可交易期貨代碼說明
+
+| 期貨代碼 | 名稱 | 點數價值 |
+|---------|------|---------|
+| TXF | 臺股期貨（大台） | 1點 = 200元 |
+| MXF | 小型臺指（小台） | 1點 = 50元 |
+| TMF | 微型臺指期貨 | 1點 = 10元 |
+
+⚠️ 注意：TMF 是臺灣期貨交易所的「微型臺指期貨」，不是美國國債期貨！
+
+請設計一個完整的交易策略，必須包含：
+1. 使用的技術指標（如 RSI、MACD、均線、布林通道等）
+2. 具體的買入條件
+3. 具體的賣出條件
+4. 停損止盈的執行邏輯
+5. 風險控制建議
+
+請用繁體中文回答，直接描述策略邏輯即可，不需要代碼。"""
+
+# 交易方向說明
+_DIRECTION_TEXT = {
+    "long": "只做多 (只買進開多)",
+    "short": "只做空 (只賣出開空)",
+    "both": "多空都做"
+}
+
+# preview 的 user 訊息（變動欄位）
+_STRATEGY_PROMPT_TMPL = """請根據以下信息設計一個期貨交易策略：
+
+期貨代碼：{symbol}
+交易方向：{direction}
+用戶目標/描述：{prompt}
+時間框架：{timeframe}
+停損：{stop_loss}
+止盈：{take_profit}
+交易口數：{quantity}"""
+
+# LLM 回應的參數欄位，單次掃描依群組名稱取得各欄位第一次出現的值
+_RE_PARAMS = re.compile(
+    r'(?i:時間框架[:：]\s*(?P<tf>\d+[mhd]))'
+    r'|(?:停損|止损)[:：]\s*(?P<sl>\d+)'
+    r'|(?:止盈|停利)[:：]\s*(?P<tp>\d+)'
+    r'|口數[:：]\s*(?P<qty>\d+)'
+)
+
+
+def _extract_params(content: str) -> dict:
+    """從 LLM 回應取出時間框架/停損/止盈/口數（各取第一次出現者）"""
+    found = {}
+    for match in _RE_PARAMS.finditer(content):
+        name = match.lastgroup
+        if name not in found:
+            found[name] = match.group(name)
+            if len(found) == 4:
+                break
+    return found
+
+
+WORKSPACE_ROOT = Path(WORKSPACE_PATH).resolve()
+
+
+def _resolve_workspace_file(path) -> Optional[Path]:
+    """将档案路径解析为 workspace 下的绝对路径，不在 workspace 内时回传 None
+
+    相对路径可能是相对专案根目录（workspace/backtests/...）或相对 workspace（backtests/...）
+    """
+    p = Path(path)
+    if not p.is_absolute():
+        parts = p.parts
+        p = WORKSPACE_ROOT.joinpath(*(parts[1:] if parts[:1] == ("workspace",) else parts))
+    p = p.resolve()
+    try:
+        p.relative_to(WORKSPACE_ROOT)
+    except ValueError:
+        return None
+    return p
+
+
+def _workspace_url(path: Path) -> str:
+    """workspace 下的档案路径转为 /workspace/... URL"""
+    return f"/workspace/{path.relative_to(WORKSPACE_ROOT).as_posix()}"
+
+
+# preview 的 LLM 回應快取：相同參數與（忽略空白的）提示詞直接重用
+_preview_cache = LLMResponseCache()
+# 尚未寫入快取前的並行相同請求（如前端快速重試）共用同一次 LLM 呼叫
+_preview_flight = SingleFlight()
+
 
 def get_trading_tools():
     """获取 trading_tools 实例"""
@@ -22,6 +121,12 @@ def get_llm_provider():
     return current_app.llm_provider
 
 
+def run_io(coro, timeout=None):
+    """在 app 的常驻背景 event loop 上執行协程"""
+    from flask import current_app
+    return current_app.run_io(coro, timeout=timeout)
+
+
 @create_bp.route('/strategies/create')
 def create_strategy_page():
     """显示创建策略页面"""
@@ -75,44 +180,16 @@ def preview_strategy():
         # 调用 LLM 生成完整的策略描述
         trading_tools = get_trading_tools()
         
-        # 交易方向說明
-        direction_text = {
-            "long": "只做多 (只買進開多)",
-            "short": "只做空 (只賣出開空)",
-            "both": "多空都做"
-        }
-        
-        # 构建生成策略描述的 prompt
-        strategy_prompt = f"""請根據以下信息設計一個期貨交易策略：
-
-## ⚠️ 重要：可交易期貨代碼說明
-
-| 期貨代碼 | 名稱 | 點數價值 |
-|---------|------|---------|
-| TXF | 臺股期貨（大台） | 1點 = 200元 |
-| MXF | 小型臺指（小台） | 1點 = 50元 |
-| TMF | 微型臺指期貨 | 1點 = 10元 |
-
-⚠️ 注意：TMF 是臺灣期貨交易所的「微型臺指期貨」，不是美國國債期貨！
-
----
-
-期貨代碼：{symbol}
-交易方向：{direction_text.get(direction, '多空都做')}
-用戶目標/描述：{prompt}
-時間框架：{timeframe}
-停損：{stop_loss if stop_loss else '根據策略計算'}
-止盈：{take_profit if take_profit else '根據策略計算'}
-交易口數：{quantity}
-
-請設計一個完整的交易策略，必須包含：
-1. 使用的技術指標（如 RSI、MACD、均線、布林通道等）
-2. 具體的買入條件
-3. 具體的賣出條件
-4. 停損止盈的執行邏輯
-5. 風險控制建議
-
-請用繁體中文回答，直接描述策略邏輯即可，不需要代碼。"""
+        # 构建生成策略描述的 prompt（只含变动栏位，固定说明在 _STRATEGY_SYSTEM_PREFIX）
+        strategy_prompt = _STRATEGY_PROMPT_TMPL.format_map({
+            "symbol": symbol,
+            "direction": _DIRECTION_TEXT.get(direction, "多空都做"),
+            "prompt": prompt,
+            "timeframe": timeframe,
+            "stop_loss": stop_loss or "根據策略計算",
+            "take_profit": take_profit or "根據策略計算",
+            "quantity": quantity,
+        })
 
         # 调用 LLM
         llm_provider = get_llm_provider()
@@ -131,30 +208,38 @@ def preview_strategy():
             })
         
         try:
-            response = asyncio.run(llm_provider.chat(
-                messages=[
-                    {"role": "system", "content": "你是一個專業的期貨交易策略分析師。請根據用戶的需求設計完整的交易策略。"},
-                    {"role": "user", "content": strategy_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            ))
-            
-            content = response.get("content", "") if isinstance(response, dict) else str(response)
+            cache_key = make_key(
+                symbol=symbol, direction=direction, timeframe=timeframe,
+                prompt=normalize_prompt(prompt), sl=stop_loss, tp=take_profit, qty=quantity
+            )
+            content = _preview_cache.get(cache_key)
+            if content is None:
+                def fetch():
+                    response = run_io(llm_provider.chat(
+                        messages=[
+                            {"role": "system", "content": _STRATEGY_SYSTEM_PREFIX},
+                            {"role": "user", "content": strategy_prompt}
+                        ],
+                        temperature=0.3,
+                        max_tokens=2000
+                    ), timeout=LLM_TIMEOUT)
+                    
+                    result = response.get("content", "") if isinstance(response, dict) else str(response)
+                    if result:
+                        _preview_cache.set(cache_key, result)
+                    return result
+                
+                content = _preview_flight.do(cache_key, fetch)
+            else:
+                logger.info("Preview LLM cache hit")
             
             # 尝试解析 LLM 返回的参数
-            import re
-            
-            # 提取参数
-            tf_match = re.search(r'時間框架[:：]\s*(\d+[mhd])', content, re.IGNORECASE)
-            sl_match = re.search(r'(?:停損|止损)[:：]\s*(\d+)', content)
-            tp_match = re.search(r'(?:止盈|停利)[:：]\s*(\d+)', content)
-            qty_match = re.search(r'口數[:：]\s*(\d+)', content)
+            params = _extract_params(content)
             
-            inferred_timeframe = tf_match.group(1) if tf_match else timeframe
-            inferred_stop_loss = int(sl_match.group(1)) if sl_match else (30 if symbol in ['TXF', 'MXF'] else 15)
-            inferred_take_profit = int(tp_match.group(1)) if tp_match else (50 if symbol in ['TXF', 'MXF'] else 25)
-            inferred_quantity = int(qty_match.group(1)) if qty_match else quantity
+            inferred_timeframe = params.get("tf", timeframe)
+            inferred_stop_loss = int(params["sl"]) if "sl" in params else (30 if symbol in ['TXF', 'MXF'] else 15)
+            inferred_take_profit = int(params["tp"]) if "tp" in params else (50 if symbol in ['TXF', 'MXF'] else 25)
+            inferred_quantity = int(params["qty"]) if "qty" in params else quantity
             
             # 如果用户已经提供了部分参数，优先使用用户的参数
             final_timeframe = timeframe if timeframe != '15m' else inferred_timeframe
@@ -180,7 +265,7 @@ def preview_strategy():
             })
             
         except Exception as e:
-            logger.warning(f"LLM inference failed: {e}, using user input")
+            logger.warning("LLM inference failed: %s, using user input", e)
             # 如果 LLM 失败，使用用户输入
             return jsonify({
                 "success": True,
@@ -196,7 +281,7 @@ def preview_strategy():
             })
             
     except Exception as e:
-        logger.error(f"Preview error: {e}")
+        logger.error("Preview error: %s", e)
         return jsonify({
             "success": False,
             "message": f"生成预览失败: {str(e)}"
@@ -287,108 +372,49 @@ def confirm_strategy():
         trading_tools._pending_strategy = params
         trading_tools._awaiting_confirm = True
         
-        # 调用 confirm_create_strategy
-        result = None
+        # 调用 confirm_create_strategy_detail，直接取得结构化的验证结果
         try:
-            logger.info(f"Calling confirm_create_strategy with params: {params}")
-            result = trading_tools.confirm_create_strategy(confirmed=True)
-            logger.info(f"confirm_create_strategy returned: {result[:500] if result else 'None'}...")
+            logger.info("Calling confirm_create_strategy with params: %r", params)
+            detail = trading_tools.confirm_create_strategy_detail(confirmed=True)
+            logger.info("confirm_create_strategy returned: %.500s...", detail["result_text"])
         except Exception as e:
-            logger.error(f"Confirm strategy error: {e}")
+            logger.exception("Confirm strategy error")
             return jsonify({
                 "success": False,
                 "message": f"確認策略失敗: {str(e)}"
             }), 500
         
-        # 如果 result 為 None 或空
-        if not result:
-            return jsonify({
-                "success": False,
-                "message": "策略建立失敗: 沒有返回結果"
-            }), 500
-        
-        # 解析结果
-        # 返回格式应该是："✅ 策略已建立并通过验证\n..." 或 "❌ 驗證失敗..."
-        
-        # 检查是否验证通过
-        verification_passed = "通過" in result or "通過驗證" in result or "已建立" in result or "已建立並通過驗證" in result
-        verification_failed = "失敗" in result or "未通過" in result
-        
-        # 提取策略 ID
-        strategy_id_match = re.search(r'ID[:：]\s*([A-Z]+\d+)', result)
-        strategy_id = strategy_id_match.group(1) if strategy_id_match else None
-        
-        # 提取策略名称
-        name_match = re.search(r'名稱[:：]\s*(.+)', result)
-        strategy_name_result = name_match.group(1).strip() if name_match else strategy_name
-        
-        # 尝试提取具体的失败原因
-        stage1_passed = verification_passed
-        stage2_passed = verification_passed
-        stage1_error = None
-        stage2_error = None
-        
-        if verification_failed:
-            # 解析 "Stage 1 失敗:" 或 "Stage 2 失敗:" 來判斷哪個階段失敗
-            if "Stage 1" in result and "失敗" in result:
-                stage1_passed = False
-                stage2_passed = False
-                # 提取 Stage 1 的錯誤訊息
-                stage1_match = re.search(r'Stage 1 失敗[：:]\s*(.+)', result)
-                if stage1_match:
-                    stage1_error = stage1_match.group(1).strip()
-                else:
-                    # 嘗試從 "原因：" 提取
-                    if "原因：" in result:
-                        error_match = re.search(r'原因[：:]\s*(.+)', result)
-                        if error_match:
-                            stage1_error = error_match.group(1).strip()
-                    if not stage1_error:
-                        stage1_error = result[:200] if len(result) > 200 else result
-            elif "Stage 2" in result and "失敗" in result:
-                stage2_passed = False
-                # Stage 1 應該通過了
-                stage1_passed = True
-                # 提取 Stage 2 的錯誤訊息
-                stage2_match = re.search(r'Stage 2 失敗[：:]\s*(.+)', result)
-                if stage2_match:
-                    stage2_error = stage2_match.group(1).strip()
-                else:
-                    stage2_error = result[:200] if len(result) > 200 else result
-            else:
-                # 沒有明確的 Stage 標記，使用默認值
-                stage1_error = result[:200] if len(result) > 200 else result
+        verification_passed = detail["created"]
+        strategy_id = detail["strategy_id"]
+        strategy_name_result = detail["name"] or strategy_name
+        stage1_passed = detail["stage1"]["passed"]
         
         # 构建验证结果
         verification_result = {
             "stage1_passed": stage1_passed,
-            "stage1_error": stage1_error,
-            "stage2_passed": stage2_passed,
-            "stage2_error": stage2_error,
+            "stage1_error": detail["stage1"]["error"],
+            "stage2_passed": detail["stage2"]["passed"],
+            "stage2_error": detail["stage2"]["error"],
         }
         
         # Stage 1 失敗時，獲取日誌檔案路徑
         if not stage1_passed:
-            logger.info(f"Stage 1 failed detected, checking for log file...")
+            logger.info("Stage 1 failed detected, checking for log file...")
             last_error = getattr(trading_tools, '_last_verification_error', None)
-            logger.info(f"Last error value: {last_error}")
+            logger.info("Last error value: %s", last_error)
             if last_error and 'stage1_log_file' in last_error:
                 log_file_path = last_error['stage1_log_file']
-                logger.info(f"Log file path from error: {log_file_path}")
-                if log_file_path:
+                logger.info("Log file path from error: %s", log_file_path)
+                log_file = _resolve_workspace_file(log_file_path) if log_file_path else None
+                if log_file:
                     # 轉換為可訪問的 URL 路徑
-                    log_file_str = str(log_file_path).replace("\\", "/")
-                    if "workspace/" in log_file_str:
-                        log_file_str = log_file_str.split("workspace/")[-1]
-                        log_file_str = f"/workspace/{log_file_str}"
-                    elif not log_file_str.startswith("workspace/") and not log_file_str.startswith("/workspace/"):
-                        log_file_str = f"/workspace/{log_file_str}"
+                    log_file_str = _workspace_url(log_file)
                     verification_result["stage1_log_file"] = log_file_str
-                    logger.info(f"Added stage1_log_file to response: {log_file_str}")
+                    logger.info("Added stage1_log_file to response: %s", log_file_str)
                 else:
-                    logger.warning(f"stage1_log_file is None in last_error")
+                    logger.warning("stage1_log_file is missing or outside workspace: %s", log_file_path)
             else:
-                logger.warning(f"No stage1_log_file in last_error: {last_error}")
+                logger.warning("No stage1_log_file in last_error: %s", last_error)
         
         # 如果验证通过，尝试获取回测结果
         chart_path = None
@@ -404,7 +430,7 @@ def confirm_strategy():
                         verification_result["win_rate"] = backtest_result["metrics"].get("win_rate", 0)
                         verification_result["total_return"] = backtest_result["metrics"].get("total_return", 0)
             except Exception as e:
-                logger.warning(f"Backtest after confirm failed: {e}")
+                logger.warning("Backtest after confirm failed: %s", e)
         
         response_data = {
             "strategy_id": strategy_id,
@@ -412,48 +438,12 @@ def confirm_strategy():
             "verification": verification_result
         }
         
-        if chart_path:
-            # 转换路径（支持相对路径和绝对路径）
-            chart_path_str = str(chart_path).replace("\\", "/")
-            
-            if "workspace/" in chart_path_str:
-                # 绝对路径：提取 workspace 之后部分
-                chart_path_str = chart_path_str.split("workspace/")[-1]
-                chart_path_str = f"/workspace/{chart_path_str}"
-            elif not chart_path_str.startswith("workspace/") and not chart_path_str.startswith("/workspace/"):
-                # 相对路径（如 backtests/xxx.html）：添加 /workspace/ 前缀
-                chart_path_str = f"/workspace/{chart_path_str}"
-            
-            # 读取 HTML 文件内容
-            try:
-                import os
-                # 尝试多个可能的路径
-                possible_paths = [
-                    chart_path_str.replace("/workspace/", "workspace/"),
-                    chart_path_str.lstrip("/"),
-                    str(chart_path)
-                ]
-                
-                html_content = None
-                for html_file_path in possible_paths:
-                    if os.path.exists(html_file_path):
-                        with open(html_file_path, 'r', encoding='utf-8') as f:
-                            html_content = f.read()
-                        logger.info(f"Successfully read HTML chart from: {html_file_path}")
-                        break
-                
-                if html_content:
-                    # 不再返回完整的 HTML 内容（太大导致 JSON 解析失败）
-                    # 只返回 chart_path，让前端通过 URL 加载
-                    # response_data["chart_html"] = html_content  # 已移除
-                    response_data["chart_path"] = chart_path_str
-                    logger.info(f"Chart path set for iframe: {chart_path_str}")
-            except Exception as e:
-                logger.warning(f"Failed to read HTML chart: {e}")
-                # 即使读取失败，也返回 chart_path
-                response_data["chart_path"] = chart_path_str
-                # 即使读取失败，也返回路径供 iframe 使用
-                response_data["chart_path"] = chart_path_str
+        chart_file = _resolve_workspace_file(chart_path) if chart_path else None
+        # 只确认图表档案存在，不读取内容；前端以 iframe 经 /workspace 路由载入
+        if chart_file and chart_file.is_file():
+            chart_path_str = _workspace_url(chart_file)
+            response_data["chart_path"] = chart_path_str
+            logger.info("Chart path set for iframe: %s", chart_path_str)
         
         if analysis:
             response_data["analysis"] = analysis
@@ -471,9 +461,7 @@ def confirm_strategy():
             })
             
     except Exception as e:
-        logger.error(f"Confirm error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Confirm error")
         return jsonify({
             "success": False,
             "message": f"确认策略失败: {str(e)}"
@@ -1,10 +1,94 @@
 """Orders API Routes"""
-from flask import Blueprint, jsonify, request, current_app
+import heapq
+import itertools
+from collections import Counter, deque
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 from datetime import datetime, timedelta
 
+from src.web.conditional import make_etag, not_modified, with_etag
+
 bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
 
+# 未指定 limit 時回傳的最新訂單筆數
+DEFAULT_LIMIT = 200
+# limit 上限（需要完整歷史請改用 /all 串流）
+MAX_LIMIT = 1000
+
+# /all 串流回應時每次輸出的訂單筆數
+STREAM_CHUNK_SIZE = 500
+
+
+def _timestamp_key(order: dict) -> str:
+    return order.get("timestamp", "")
+
+
+def _query_orders(order_mgr, status_filter, strategy_id_filter, date_filter, limit=DEFAULT_LIMIT):
+    """查詢並彙總訂單
+    
+    單次掃描同時統計各狀態數量並以 heap 取出最新的 limit 筆（由新到舊），
+    不需排序全部符合的訂單。訂單未異動時路由已由 ETag 回 304，不另外快取查詢結果。
+    """
+    start = end = None
+    if strategy_id_filter:
+        source = order_mgr.get_orders_by_strategy(strategy_id_filter)
+    elif date_filter and date_filter not in ['today', 'yesterday', 'week', 'month']:
+        # Legacy single date filter (YYYY-MM-DD format)
+        source = (
+            o for o in order_mgr.store.iter_orders()
+            # timestamp 為 ISO 格式，日期必在開頭，以前綴比對取代子字串搜尋
+            if o.get("timestamp", "").startswith(date_filter)
+        )
+    elif date_filter in ('yesterday', 'week', 'month'):
+        now = datetime.now()
+        if date_filter == 'yesterday':
+            # Yesterday: full day
+            yesterday = now - timedelta(days=1)
+            start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+            end = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999).isoformat()
+        elif date_filter == 'week':
+            # This week: from Monday to now
+            start = (now - timedelta(days=now.weekday())).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ).isoformat()
+        else:
+            # This month: from 1st of month to now
+            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+        source = order_mgr.store.iter_orders()
+    else:
+        # Default: today
+        source = order_mgr.get_today_orders()
+    
+    counts = Counter()
+    
+    def matched():
+        for o in source:
+            if start is not None:
+                ts = o.get("timestamp", "")
+                if ts < start or (end is not None and ts > end):
+                    continue
+            if status_filter and o.get("status") != status_filter:
+                continue
+            counts[o.get("status")] += 1
+            yield o
+    
+    # 按時間排序（由新到舊），只保留前 limit 筆
+    orders = heapq.nlargest(limit, matched(), key=_timestamp_key)
+    if limit <= 0:
+        # nlargest(0, ...) 不會走訪來源，summary 仍需統計全部符合的訂單
+        deque(matched(), maxlen=0)
+    
+    summary = {
+        "total": sum(counts.values()),
+        "filled": counts["Filled"],
+        "cancelled": counts["Cancelled"],
+        "rejected": counts["Rejected"],
+        "submitted": counts["Submitted"],
+        "pending": counts["Pending"]
+    }
+    return orders, summary
+
+
 @bp.route('', methods=['GET'])
 def get_orders():
     """取得訂單列表
@@ -13,6 +97,7 @@ def get_orders():
         - status: Pending/Submitted/Filled/Cancelled/Rejected (optional)
         - strategy_id: 特定策略 ID (optional)
         - date: 日期 YYYY-MM-DD，預設今日
+        - limit: 回傳最新的幾筆，預設 200、上限 1000（summary 仍統計全部符合的訂單）
     """
     try:
         tools = current_app.trading_tools
@@ -21,69 +106,30 @@ def get_orders():
         status_filter = request.args.get('status')
         strategy_id_filter = request.args.get('strategy_id')
         date_filter = request.args.get('date')
+        limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 0), MAX_LIMIT)
         
-        orders = []
-        
-        if strategy_id_filter:
-            orders = order_mgr.get_orders_by_strategy(strategy_id_filter)
-        elif date_filter and date_filter not in ['today', 'yesterday', 'week', 'month']:
-            # Legacy single date filter (YYYY-MM-DD format)
-            all_orders = order_mgr.store.get_all_orders()
-            orders = [o for o in all_orders if date_filter in o.get("timestamp", "")]
-        elif date_filter == 'yesterday':
-            # Yesterday: full day
-            now = datetime.now()
-            yesterday = now - timedelta(days=1)
-            start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-            end = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999)
-            all_orders = order_mgr.store.get_all_orders()
-            orders = [
-                o for o in all_orders
-                if start.isoformat() <= o.get("timestamp", "") <= end.isoformat()
-            ]
-        elif date_filter == 'week':
-            # This week: from Monday to now
-            now = datetime.now()
-            start = now - timedelta(days=now.weekday())
-            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
-            all_orders = order_mgr.store.get_all_orders()
-            orders = [
-                o for o in all_orders
-                if start.isoformat() <= o.get("timestamp", "")
-            ]
-        elif date_filter == 'month':
-            # This month: from 1st of month to now
-            now = datetime.now()
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            all_orders = order_mgr.store.get_all_orders()
-            orders = [
-                o for o in all_orders
-                if start.isoformat() <= o.get("timestamp", "")
-            ]
-        else:
-            # Default: today
-            orders = order_mgr.get_today_orders()
-        
-        if status_filter:
-            orders = [o for o in orders if o.get("status") == status_filter]
+        # 先讓延遲寫入落地，資料版本才會反映最新異動
+        order_mgr.flush()
+        data_version = order_mgr.store.data_version()
+        today = datetime.now().strftime("%Y-%m-%d")
         
-        # 按時間排序（由新到舊）
-        orders.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        # 訂單未異動時直接回 304，省去查詢與序列化
+        etag = make_etag(
+            "orders", data_version, today, status_filter, strategy_id_filter, date_filter, limit
+        )
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
         
-        summary = {
-            "total": len(orders),
-            "filled": len([o for o in orders if o.get("status") == "Filled"]),
-            "cancelled": len([o for o in orders if o.get("status") == "Cancelled"]),
-            "rejected": len([o for o in orders if o.get("status") == "Rejected"]),
-            "submitted": len([o for o in orders if o.get("status") == "Submitted"]),
-            "pending": len([o for o in orders if o.get("status") == "Pending"])
-        }
+        orders, summary = _query_orders(
+            order_mgr, status_filter, strategy_id_filter, date_filter, limit
+        )
         
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "data": orders,
             "summary": summary
-        })
+        }), etag)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -93,25 +139,36 @@ def get_orders():
 
 @bp.route('/all', methods=['GET'])
 def get_all_orders():
-    """取得所有歷史訂單"""
+    """取得所有歷史訂單（由新到舊）"""
     try:
         tools = current_app.trading_tools
         order_mgr = tools.order_mgr
         
-        all_orders = order_mgr.store.get_all_orders()
-        
-        all_orders.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        
-        return jsonify({
-            "success": True,
-            "data": all_orders,
-            "total": len(all_orders)
-        })
+        order_mgr.flush()
+        all_orders = order_mgr.store.iter_orders_sorted_desc()
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
+    
+    # 歷史訂單會持續累積，邊合併邊分段序列化串流輸出，不保留整份歷史或回應內容；
+    # 總筆數於結尾才知道，因此 total 放在 data 之後
+    dumps = current_app.json.dumps
+    
+    def generate():
+        yield '{"success": true, "data": ['
+        total = 0
+        while True:
+            chunk = list(itertools.islice(all_orders, STREAM_CHUNK_SIZE))
+            if not chunk:
+                break
+            body = ",".join(dumps(o) for o in chunk)
+            yield body if total == 0 else "," + body
+            total += len(chunk)
+        yield '], "total": %d}' % total
+    
+    return Response(stream_with_context(generate()), mimetype="application/json")
 
 
 @bp.route('/statistics', methods=['GET'])
@@ -1,6 +1,10 @@
 """Performance API Routes"""
+from datetime import date
+
 from flask import Blueprint, jsonify, current_app, request
 
+from src.web.conditional import make_etag, not_modified, with_etag
+
 bp = Blueprint('performance', __name__, url_prefix='/api')
 
 
@@ -34,6 +38,15 @@ def get_performance():
         strategies = tools.strategy_mgr.get_all_strategies()
         analyzer = tools._get_performance_analyzer()
         
+        # 訊號資料與策略清單未變動時直接回 304（週期以當日為基準，跨日自動失效）
+        etag = make_etag(
+            "performance", analyzer.recorder.data_version(), period, date.today(),
+            tuple((s.id, s.name) for s in strategies)
+        )
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
         # 各策略績效明細
         strategy_performances = []
         
@@ -91,10 +104,10 @@ def get_performance():
         # 計算 equity_curve（按日期排序並合併）
         equity_curve = {}
         for item in all_signals:
-            date = item.get('date', '')
+            day = item.get('date', '')
             pnl = item.get('pnl', 0)
-            if date:
-                equity_curve[date] = equity_curve.get(date, 0) + pnl
+            if day:
+                equity_curve[day] = equity_curve.get(day, 0) + pnl
         
         # 轉換為排序後的列表
         equity_curve_list = [
@@ -102,7 +115,7 @@ def get_performance():
             for k, v in sorted(equity_curve.items())
         ]
         
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "period": period,
             "total_trades": total_trades,
@@ -116,7 +129,7 @@ def get_performance():
             "equity_curve": equity_curve_list,
             "trade_distribution": [round(p, 2) for p in all_pnl_values] if all_pnl_values else [],
             "strategy_performances": strategy_performances
-        })
+        }), etag)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -151,10 +164,18 @@ def get_strategy_performance(strategy_id):
         
         # 取得該策略的績效分析
         analyzer = tools._get_performance_analyzer()
+        etag = make_etag(
+            "performance", strategy_id, strategy.name,
+            analyzer.recorder.data_version(), period, date.today()
+        )
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
         analysis = analyzer.analyze(strategy_id, period=period)
         stats = analysis.get('signal_stats', {})
         
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "strategy_id": strategy_id,
             "strategy_name": strategy.name,
@@ -180,7 +201,7 @@ def get_strategy_performance(strategy_id):
             "signal_reversal_count": stats.get('signal_reversal_count', 0),
             "equity_curve": stats.get('equity_curve', []),
             "trade_distribution": stats.get('trade_distribution', [])
-        })
+        }), etag)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -1,7 +1,26 @@
 """Positions API Routes"""
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, request, current_app
+
+from src.web.conditional import PayloadCache, cached_json
+from src.web.responses import handle_api_error
 
 bp = Blueprint('positions', __name__, url_prefix='/api/positions')
+bp.register_error_handler(Exception, handle_api_error)
+
+# GET /api/positions 的回應快取（依 strategy_id 篩選條件）
+_payload_cache = PayloadCache(ttl=0.5)
+
+# 回應欄位與缺值時的預設值
+_POSITION_FIELDS = (
+    ("strategy_id", ""),
+    ("strategy_name", ""),
+    ("symbol", ""),
+    ("direction", ""),
+    ("quantity", 0),
+    ("entry_price", 0),
+    ("current_price", 0),
+    ("pnl", 0),
+)
 
 
 @bp.route('', methods=['GET'])
@@ -11,42 +30,33 @@ def get_positions():
     Query params:
         - strategy_id: 特定策略 ID (optional)
     """
-    try:
-        tools = current_app.trading_tools
-        strategy_id_filter = request.args.get('strategy_id')
-        
-        all_positions = tools.position_mgr.get_all_positions()
+    tools = current_app.trading_tools
+    strategy_id_filter = request.args.get('strategy_id')
+    
+    def build():
+        # 先統一轉為 dict（每筆只呼叫一次 to_dict），再篩選與格式化
+        positions = [
+            p.to_dict() if hasattr(p, 'to_dict') else p
+            for p in tools.position_mgr.get_all_positions()
+        ]
         
         # 根據策略 ID 篩選
         if strategy_id_filter:
-            all_positions = [p for p in all_positions 
-                          if (hasattr(p, 'strategy_id') and p.strategy_id == strategy_id_filter)
-                          or (hasattr(p, 'to_dict') and p.to_dict().get('strategy_id') == strategy_id_filter)]
-        
-        summary = tools.position_mgr.get_positions_summary()
+            positions = [d for d in positions if d.get("strategy_id") == strategy_id_filter]
         
-        result = []
-        for pos in all_positions:
-            if hasattr(pos, 'to_dict'):
-                pos_dict = pos.to_dict()
-            else:
-                pos_dict = pos
-            result.append({
-                "strategy_id": pos_dict.get("strategy_id", ""),
-                "strategy_name": pos_dict.get("strategy_name", ""),
-                "symbol": pos_dict.get("symbol", ""),
-                "direction": pos_dict.get("direction", ""),
-                "quantity": pos_dict.get("quantity", 0),
-                "entry_price": pos_dict.get("entry_price", 0),
-                "current_price": pos_dict.get("current_price", 0),
-                "pnl": pos_dict.get("pnl", 0)
-            })
+        result = [
+            {key: d.get(key, default) for key, default in _POSITION_FIELDS}
+            for d in positions
+        ]
         
-        # 計算篩選後的總結
-        filtered_quantity = sum(p.get("quantity", 0) for p in result)
-        filtered_pnl = sum(p.get("pnl", 0) for p in result)
+        # 計算篩選後的總結（單次掃描）
+        filtered_quantity = 0
+        filtered_pnl = 0
+        for p in result:
+            filtered_quantity += p["quantity"]
+            filtered_pnl += p["pnl"]
         
-        return jsonify({
+        return {
             "success": True,
             "data": result,
             "summary": {
@@ -54,9 +64,7 @@ def get_positions():
                 "total_pnl": filtered_pnl,
                 "count": len(result)
             }
-        })
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        }
+    
+    # 儀表板頻繁輪詢：短時間內重用已序列化的內容，內容未變時回 304
+    return cached_json(_payload_cache, strategy_id_filter, build)
@@ -1,21 +1,28 @@
 """Risk API Routes"""
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, current_app
+
+from src.web.conditional import PayloadCache, cached_json
+from src.web.responses import handle_api_error
 
 bp = Blueprint('risk', __name__, url_prefix='/api/risk')
+bp.register_error_handler(Exception, handle_api_error)
+
+# 風控狀態閒置時幾乎不變，以內容 ETag 讓輪詢回 304
+_payload_cache = PayloadCache(ttl=0.5)
 
 
 @bp.route('', methods=['GET'])
 def get_risk():
     """取得風控狀態"""
-    try:
-        tools = current_app.trading_tools
-        risk_text = tools.get_risk_status()
+    tools = current_app.trading_tools
+    
+    def build():
         risk_status = tools.risk_mgr.get_status()
         
         # 從 PositionManager 取得實際部位數量
         current_position = tools.position_mgr.get_total_quantity()
         
-        return jsonify({
+        return {
             "success": True,
             "data": {
                 "daily_pnl": risk_status.get("daily_pnl", 0),
@@ -27,9 +34,6 @@ def get_risk():
                 "stop_loss_enabled": risk_status.get("stop_loss_enabled", True),
                 "take_profit_enabled": risk_status.get("take_profit_enabled", True)
             }
-        })
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        }
+    
+    return cached_json(_payload_cache, None, build)
@@ -1,5 +1,4 @@
 """SQLite Data API Routes"""
-import asyncio
 from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, current_app
 from loguru import logger
@@ -20,7 +19,7 @@ def fetch_missing():
                 "error": "API 未連線"
             }), 400
 
-        result = asyncio.run(_fetch_missing_data(api))
+        result = current_app.run_async(_fetch_missing_data(api))
 
         return jsonify({
             "success": True,
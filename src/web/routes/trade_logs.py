@@ -1,7 +1,70 @@
 """交易日誌 API Routes"""
-from flask import Blueprint, jsonify, request, current_app
+import functools
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Optional
+
+from flask import Blueprint, Response, request, current_app
+
+from src.web.responses import ok, err, handle_api_error
 
 bp = Blueprint('trade_logs', __name__, url_prefix='/api/trade-logs')
+bp.register_error_handler(Exception, handle_api_error)
+
+# 事件類型的中文顯示名稱
+_EVENT_TYPE_DISPLAY = {
+    "ORDER_SUBMITTED": "訂單提交",
+    "ORDER_FILLED": "訂單成交",
+    "ORDER_SUCCESS": "下單成功",
+    "CLOSE_POSITION": "平倉",
+    "RISK_BLOCKED": "風控擋單",
+    "ORDER_FAILED": "下單失敗",
+    "SYSTEM": "系統訊息"
+}
+
+
+@dataclass(frozen=True)
+class LogQuery:
+    """交易日誌查詢參數"""
+    limit: int = 50
+    event_type: Optional[str] = None
+    strategy_id: Optional[str] = None
+    
+    MAX_LIMIT = 100
+    
+    @classmethod
+    def from_request(cls) -> "LogQuery":
+        """解析查詢參數；limit 不是整數時拋出 ValueError"""
+        args = request.args
+        limit = args.get('limit', cls.limit)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError(f"limit 必須是整數: {limit}")
+        return cls(
+            limit=max(min(limit, cls.MAX_LIMIT), 0),
+            event_type=args.get('event_type') or None,
+            strategy_id=args.get('strategy_id') or None
+        )
+
+
+def _format_log(log: dict) -> dict:
+    """補上顯示用欄位（store 每次都從檔案重新載入，dict 為本次專用，可直接修改）"""
+    # 新日誌寫入時已帶 formatted_time；舊資料（保留期內）才需解析 timestamp
+    if not log.get("formatted_time"):
+        log["formatted_time"] = _fmt_ts(log['timestamp'])
+    log["event_type_display"] = _EVENT_TYPE_DISPLAY.get(log['event_type'], log['event_type'])
+    return log
+
+
+@functools.lru_cache(maxsize=256)
+def _fmt_ts(timestamp: str) -> str:
+    """ISO 時間轉為顯示格式，無法解析時原樣回傳（相鄰日誌常有相同時間，快取結果）"""
+    try:
+        return datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return timestamp
 
 
 @bp.route('', methods=['GET'])
@@ -14,101 +77,70 @@ def get_trade_logs():
         strategy_id: 過濾策略ID (可選)
     """
     try:
-        tools = current_app.trading_tools
-        
-        # 取得查詢參數
-        limit = min(int(request.args.get('limit', 50)), 100)
-        event_type = request.args.get('event_type') or None
-        strategy_id = request.args.get('strategy_id') or None
-        
-        # 取得日誌
-        logs = tools.trade_log_store.get_recent_logs(
-            limit=limit,
-            event_type=event_type,
-            strategy_id=strategy_id
-        )
-        
-        # 格式化時間顯示
-        formatted_logs = []
+        query = LogQuery.from_request()
+    except ValueError as e:
+        return err(e, 400)
+    
+    tools = current_app.trading_tools
+    
+    # 取得日誌（過濾與筆數上限由 store 處理）
+    logs = tools.trade_log_store.get_recent_logs(
+        limit=query.limit,
+        event_type=query.event_type,
+        strategy_id=query.strategy_id
+    ) if query.limit > 0 else []
+    
+    # 格式化時間顯示
+    formatted_logs = [_format_log(log) for log in logs]
+    
+    return ok(
+        data=formatted_logs,
+        count=len(formatted_logs),
+        filters={
+            "event_type": query.event_type,
+            "strategy_id": query.strategy_id
+        }
+    )
+
+
+@bp.route('/stream', methods=['GET'])
+def stream_trade_logs():
+    """以 NDJSON（每行一筆 JSON）逐筆串流交易日誌，參數同 GET /api/trade-logs"""
+    try:
+        query = LogQuery.from_request()
+    except ValueError as e:
+        return err(e, 400)
+    
+    tools = current_app.trading_tools
+    logs = islice(
+        tools.trade_log_store.iter_recent_logs(query.event_type, query.strategy_id), query.limit
+    )
+    dumps = current_app.json.dumps
+    
+    def generate():
         for log in logs:
-            from datetime import datetime
-            try:
-                dt = datetime.fromisoformat(log['timestamp'])
-                formatted_time = dt.strftime('%Y-%m-%d %H:%M:%S')
-            except:
-                formatted_time = log['timestamp']
-            
-            formatted_logs.append({
-                **log,
-                "formatted_time": formatted_time,
-                "event_type_display": _get_event_type_display(log['event_type'])
-            })
-        
-        return jsonify({
-            "success": True,
-            "data": formatted_logs,
-            "count": len(formatted_logs),
-            "filters": {
-                "event_type": event_type,
-                "strategy_id": strategy_id
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+            yield dumps(_format_log(log)) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson')
 
 
 @bp.route('/event-types', methods=['GET'])
 def get_event_types():
     """取得可用的事件類型"""
-    try:
-        tools = current_app.trading_tools
-        types = tools.trade_log_store.get_event_types()
-        
-        return jsonify({
-            "success": True,
-            "data": [
-                {"value": t, "label": _get_event_type_display(t)} 
-                for t in types
-            ]
-        })
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    tools = current_app.trading_tools
+    types = tools.trade_log_store.get_event_types()
+    
+    return ok([
+        {"value": t, "label": _EVENT_TYPE_DISPLAY.get(t, t)}
+        for t in types
+    ])
 
 
 @bp.route('/stats', methods=['GET'])
 def get_stats():
     """取得日誌統計"""
-    try:
-        tools = current_app.trading_tools
-        stats = tools.trade_log_store.get_stats()
-        
-        return jsonify({
-            "success": True,
-            "data": stats
-        })
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
-
-
-def _get_event_type_display(event_type: str) -> str:
-    """取得事件類型的中文顯示名稱"""
-    mapping = {
-        "ORDER_SUBMITTED": "訂單提交",
-        "ORDER_FILLED": "訂單成交",
-        "ORDER_SUCCESS": "下單成功",
-        "CLOSE_POSITION": "平倉",
-        "RISK_BLOCKED": "風控擋單",
-        "ORDER_FAILED": "下單失敗",
-        "SYSTEM": "系統訊息"
-    }
-    return mapping.get(event_type, event_type)
+    tools = current_app.trading_tools
+    stats = tools.trade_log_store.get_stats()
+    
+    return ok(stats)
+
@@ -0,0 +1,66 @@
+"""Web API 路由測試（以 Flask test client 實際發出請求）"""
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from src.web.routes import performance
+
+
+def _make_analyzer():
+    stats = {
+        "filled_signals": 2,
+        "win_count": 1,
+        "lose_count": 1,
+        "win_rate": 50.0,
+        "profit_factor": 2.0,
+        "total_pnl": 100,
+        "trade_distribution": [200, -100],
+        "equity_curve": [
+            {"date": "2026-01-02", "pnl": -100},
+            {"date": "2026-01-01", "pnl": 200},
+        ],
+    }
+    return SimpleNamespace(
+        recorder=SimpleNamespace(data_version=lambda: 1),
+        analyze=lambda strategy_id, period="all": {"signal_stats": stats},
+    )
+
+
+@pytest.fixture
+def client():
+    strategy = SimpleNamespace(id="s1", name="RSI策略")
+    analyzer = _make_analyzer()
+
+    app = Flask(__name__)
+    app.register_blueprint(performance.bp)
+    app.trading_tools = SimpleNamespace(
+        strategy_mgr=SimpleNamespace(
+            get_all_strategies=lambda: [strategy],
+            get_strategy=lambda strategy_id: strategy if strategy_id == "s1" else None,
+        ),
+        _get_performance_analyzer=lambda: analyzer,
+    )
+    return app.test_client()
+
+
+def test_get_performance(client):
+    resp = client.get("/api/performance")
+    assert resp.status_code == 200
+
+    data = resp.get_json()
+    assert data["success"] is True
+    assert data["total_trades"] == 2
+    assert data["equity_curve"] == [
+        {"date": "2026-01-01", "pnl": 200},
+        {"date": "2026-01-02", "pnl": -100},
+    ]
+
+    # 資料未變動時以 ETag 回 304
+    cached = client.get("/api/performance", headers={"If-None-Match": resp.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_get_strategy_performance(client):
+    assert client.get("/api/performance/s1").status_code == 200
+    assert client.get("/api/performance/missing").status_code == 404